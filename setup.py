@@ -1,5 +1,50 @@
+import os
+import re
+
 from setuptools import setup, find_packages
 
+# Generate console scripts that import the entry point module directly instead
+# of going through pkg_resources (same approach as fastentrypoints). This only
+# affects legacy egg/develop installs; wheel installs already emit direct launchers.
+try:
+    from setuptools.command import easy_install
+
+    SCRIPT_TEMPLATE = """# -*- coding: utf-8 -*-
+import re
+import sys
+
+from {module} import {attr}
+
+if __name__ == '__main__':
+    sys.argv[0] = re.sub(r'(-script\\.pyw?|\\.exe)?$', '', sys.argv[0])
+    sys.exit({func}())
+"""
+
+    @classmethod
+    def _get_direct_script_args(cls, dist, header=None):
+        if header is None:
+            header = cls.get_header()
+        for type_ in ('console', 'gui'):
+            for name, ep in dist.get_entry_map(f"{type_}_scripts").items():
+                if re.search(r'[\\/]', name):
+                    raise ValueError("Path separators not allowed in script names")
+                script_text = SCRIPT_TEMPLATE.format(
+                    module=ep.module_name, attr=ep.attrs[0], func='.'.join(ep.attrs)
+                )
+                yield from cls._get_script_args(type_, name, header, script_text)
+
+    easy_install.ScriptWriter.get_args = _get_direct_script_args
+except (ImportError, AttributeError):
+    pass
+
+# Opt-in AOT build of the typed, dependency-free token color tables:
+#   VSTG_MYPYC=1 pip install .   (needs mypy; pure-Python install otherwise)
+ext_modules = []
+if os.environ.get("VSTG_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["vscode_theme_generator/token_colors.py"])
+
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
@@ -13,6 +58,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/watkinslabs/vscode_theme_generator",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -30,12 +76,13 @@ setup(
         "jinja2>=3.0",
         "click>=8.0",
         "colorama>=0.4",
+        "numpy>=1.21",
         "wl_ai_manager",
         "wl_config_manager",
     ],
     entry_points={
         "console_scripts": [
-            "vstg=theme_generator.cli:main",
+            "vstg=vscode_theme_generator.cli:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,124 @@
+"""
+Pinned behavior of the contrast fixer, AI color suggestion parsing and hex validation
+"""
+
+import random
+
+import pytest
+
+from vscode_theme_generator.ai_enhancer import AIEnhancer, _first_braced_block
+from vscode_theme_generator.color_utils import validate_hex_color
+from vscode_theme_generator.color_utils_numba import (
+    _adjust_brightness_rgb,
+    _adjust_for_contrast_rgb,
+    _contrast_ratio,
+    _luminance_rgb,
+)
+from vscode_theme_generator.constants import fast_is_hex_color
+
+
+class _Config(dict):
+    """Minimal dotted-key config, like the one the CLI passes in"""
+
+    def get(self, key, default=None):
+        node = self
+        for part in key.split('.'):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = dict.__getitem__(node, part)
+        return node
+
+
+def _brute_force_adjust(bg, fg, target):
+    """Reference contrast fix: scan every 1% step in both directions"""
+    bg_lum = _luminance_rgb(*bg)
+
+    def first_passing(sign):
+        for pct in range(1, 101):
+            adjusted = _adjust_brightness_rgb(*fg, sign * pct)
+            if _contrast_ratio(bg_lum, _luminance_rgb(*adjusted)) >= target:
+                return pct
+        return 0
+
+    brighter = first_passing(1)
+    darker = first_passing(-1)
+    if brighter and (not darker or brighter <= darker):
+        return _adjust_brightness_rgb(*fg, brighter)
+    if darker:
+        return _adjust_brightness_rgb(*fg, -darker)
+    return tuple(fg)
+
+
+@pytest.mark.parametrize('target', [3.0, 4.5, 7.0])
+def test_contrast_bisection_matches_brute_force_scan(target):
+    rng = random.Random(1234)
+    for _ in range(300):
+        bg = tuple(rng.randrange(256) for _ in range(3))
+        fg = tuple(rng.randrange(256) for _ in range(3))
+        assert _adjust_for_contrast_rgb(*bg, *fg, target) == _brute_force_adjust(bg, fg, target)
+
+
+def test_contrast_fix_prefers_brighter_and_keeps_unfixable_colors():
+    # Gray on black: brightening is the only way out
+    fixed = _adjust_for_contrast_rgb(0, 0, 0, 90, 90, 90, 4.5)
+    assert fixed[0] > 90
+    assert _contrast_ratio(_luminance_rgb(0, 0, 0), _luminance_rgb(*fixed)) >= 4.5
+    # Too dark to fix even at +100%, and nothing reaches 21:1 against mid gray
+    assert _adjust_for_contrast_rgb(0, 0, 0, 40, 40, 40, 4.5) == (40, 40, 40)
+    assert _adjust_for_contrast_rgb(128, 128, 128, 120, 120, 120, 21.0) == (120, 120, 120)
+
+
+def test_first_braced_block():
+    text = 'x {"a": {"b": {}}, "c": 1} tail }'
+    assert _first_braced_block(text, text.index('{')) == '{"a": {"b": {}}, "c": 1}'
+    assert _first_braced_block('{"a": {"b": 1}', 0) is None
+
+
+@pytest.fixture
+def enhancer():
+    return AIEnhancer(_Config({'ai': {'enabled': False}}))
+
+
+ORIGINAL = {'editor.background': '#000000', 'editor.foreground': '#ffffff'}
+
+
+@pytest.mark.parametrize('response, expected', [
+    # JSON object with a nested value
+    ('Here: {"editor.background": "#101010", "meta": {"x": 1}} ok',
+     {'editor.background': '#101010', 'editor.foreground': '#ffffff'}),
+    # Python literal with a nested dict (not JSON)
+    ("Sure {'editor.foreground': '#eeeeee', 'meta': {'x': 1}} done",
+     {'editor.background': '#000000', 'editor.foreground': '#eeeeee'}),
+    # No braces at all: key/value lines
+    ('editor.background: #131313\neditor.foreground: #dddddd',
+     {'editor.background': '#131313', 'editor.foreground': '#dddddd'}),
+    # Unbalanced braces still fall back to key/value lines
+    ('editor.background: #141414 {oops',
+     {'editor.background': '#141414', 'editor.foreground': '#ffffff'}),
+    # 7 hex digits is never a color
+    ('editor.background: #1414141', ORIGINAL),
+])
+def test_parse_color_suggestions(enhancer, response, expected):
+    assert enhancer._parse_color_suggestions(response, ORIGINAL) == expected
+
+
+def test_parse_color_suggestions_returns_original_when_nothing_applies(enhancer):
+    assert enhancer._parse_color_suggestions('no colors here', ORIGINAL) is ORIGINAL
+
+
+@pytest.mark.parametrize('color, valid', [
+    ('#a1b2c3', True),
+    ('#A1B2C3', True),
+    ('#a1b2c3d4', True),
+    ('#a1b2c3\n', False),
+    ('#a1b2c3d4\n', False),
+    ('#abc', False),
+    ('a1b2c3d', False),
+    ('#a1b2cg', False),
+    ('#a1b2cé', False),
+    ('#a1b2c3d', False),
+    ('', False),
+])
+def test_hex_validation(color, valid):
+    assert validate_hex_color(color) is valid
+    assert fast_is_hex_color(color) is valid
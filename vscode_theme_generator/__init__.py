@@ -4,13 +4,19 @@ VS Code Theme Generator
 A comprehensive tool for generating VS Code themes with AI enhancement
 """
 
-from .builder import ThemeBuilder
-from .templater import Templater
-from .ai_enhancer import AIEnhancer
-from .packager import Packager
-from .icon_generator import IconGenerator
+from importlib import import_module
+
 from .constants import VERSION, THEME_SCHEMA_VERSION
 
+# Heavy components are imported on first access (PEP 562)
+_LAZY_IMPORTS = {
+    "ThemeBuilder": ".builder",
+    "Templater": ".templater",
+    "AIEnhancer": ".ai_enhancer",
+    "Packager": ".packager",
+    "IconGenerator": ".icon_generator",
+}
+
 __version__ = VERSION
 __all__ = [
     "ThemeBuilder",
@@ -20,4 +26,17 @@ __all__ = [
     "IconGenerator",
     "VERSION",
     "THEME_SCHEMA_VERSION",
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    """Import heavy components on first access"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    """Include lazily imported components in dir() and completion"""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -2,31 +2,225 @@
 AI Enhancement module for theme optimization
 """
 
+import ast
+import asyncio
+import contextlib
+import hashlib
 import json
 import logging
-from typing import Dict, Any, List, Tuple
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
-from wl_ai_manager import AIManager
+import numpy as np
 
-from .constants import AI_PROMPTS
 from .color_utils import (
     validate_hex_color,
     calculate_contrast_ratio,
     adjust_brightness,
     get_complementary_color,
-    get_brightness,
     blend_colors,
-    saturate_color
+    saturate_array,
+    hex_to_rgb,
+    rgb_to_hex,
+    is_dark_rgb,
+    brightness_int_array,
+    rgb_array_to_hex,
+    adjust_brightness_array,
+    hex_to_rgb_array
 )
+from .color_utils_numba import _adjust_for_contrast_rgb, warm_up as warm_up_color_kernels
+from .token_colors import fallback_token_colors
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
+# The same few palette values are checked over and over across contrast pairs,
+# variants and AI suggestions; memoize the check for this module
+_is_hex_color = lru_cache(maxsize=1024)(validate_hex_color)
+
+# Patterns used when parsing AI responses
+_SUGGEST_RE = re.compile(r'([a-zA-Z.]+):[ \t]*(#[0-9A-Fa-f]{6,8})')
+_NAME_RE = re.compile(r'name["\']?\s*:\s*["\']([^"\']+)["\']')
+_SCOPE_RE = re.compile(r'scope["\']?\s*:\s*\[([^\]]+)\]')
+_FG_RE = re.compile(r'foreground["\']?\s*:\s*["\']?(#[0-9A-Fa-f]{6})["\']?')
+
+
+def _first_braced_block(text: str, start: int) -> Optional[str]:
+    """Return the balanced {...} block opening at text[start], or None"""
+    depth = 0
+    pos = start
+    next_open = start
+    while True:
+        next_close = text.find('}', pos)
+        if next_close == -1:
+            return None
+        # Jump brace to brace; text between them is never looked at
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            pos = next_open + 1
+            next_open = text.find('{', pos)
+        else:
+            depth -= 1
+            pos = next_close + 1
+            if depth == 0:
+                return text[start:pos]
+
+# High-contrast variant: key colors pinned to pure black/white by theme darkness
+_HC_DARK_OVERRIDES = {
+    'editor.background': '#000000',
+    'editor.foreground': '#ffffff',
+    'sideBar.background': '#000000',
+    'activityBar.background': '#000000',
+    'statusBar.background': '#000000',
+    'terminal.background': '#000000',
+}
+_HC_LIGHT_OVERRIDES = {
+    'editor.background': '#ffffff',
+    'editor.foreground': '#000000',
+    'sideBar.background': '#ffffff',
+    'activityBar.background': '#ffffff',
+    'statusBar.background': '#ffffff',
+    'terminal.background': '#ffffff',
+}
+_HC_ACCENT_KEYS = ('activityBarBadge.background', 'button.background',
+                   'progressBar.background', 'selection.background')
+
+# Default prompts for description enhancement
+DESCRIPTION_USER_PROMPT = """Enhance this VS Code theme description to be more engaging and descriptive.
+Keep it concise but compelling, under 200 characters.
+
+Theme: {theme_name}
+Current description: {description}
+
+Provide an enhanced description that:
+- Highlights the unique visual characteristics
+- Mentions the target audience or use case
+- Uses vivid but professional language
+- Stays under 200 characters"""
+
+DESCRIPTION_SYSTEM_PROMPT = """You are a marketing copywriter specializing in developer tools. Create compelling, concise descriptions for VS Code themes."""
+
+# Default prompts for the combined description/colors/token colors request
+ENHANCE_ALL_USER_PROMPT = """Enhance this VS Code theme in one pass.
+
+Theme: {theme_name}
+Current description: {description}
+
+Current colors:
+{colors}
+
+Key colors for syntax highlighting:
+{base_colors}
+
+Return a single JSON object with exactly these fields:
+{
+    "description": "Engaging description under 200 characters",
+    "colors": {"editor.background": "#1a1a1a"},
+    "token_colors": [
+        {
+            "name": "Comment",
+            "scope": ["comment", "punctuation.definition.comment"],
+            "settings": {"foreground": "#6A9955", "fontStyle": "italic"}
+        }
+    ]
+}
+
+- "colors" should only include colors that need to change for contrast (WCAG), harmony and eye strain.
+- "token_colors" should cover comments, strings, keywords, functions, variables, constants, types, numbers."""
+
+ENHANCE_ALL_SYSTEM_PROMPT = """You are a color theory, accessibility and developer-marketing expert for VS Code themes. Respond with a single valid JSON object and nothing else."""
+
+# Default prompts for color optimization
+OPTIMIZE_COLORS_USER_PROMPT = """Review these VS Code theme colors and suggest optimizations.
+
+Current colors:
+{colors}
+
+Analyze for:
+1. Contrast ratios (WCAG compliance)
+2. Color harmony
+3. Eye strain reduction
+4. Consistency across UI elements
+
+Return a Python dictionary with any color changes needed. Example:
+{
+    "editor.background": "#1a1a1a",
+    "editor.foreground": "#e0e0e0"
+}
+
+Only include colors that need to be changed."""
+
+OPTIMIZE_COLORS_SYSTEM_PROMPT = """You are a color theory and accessibility expert for VS Code themes. Analyze color schemes for contrast, harmony, and usability. Return only valid Python code."""
+
+# Default prompt for token color generation
+TOKEN_COLORS_USER_PROMPT = """Based on these base colors, generate token colors for syntax highlighting.
+
+Base colors:
+{base_colors}
+
+Create a Python list of dictionaries for VS Code token colors. Example format:
+[
+    {
+        "name": "Comment",
+        "scope": ["comment", "punctuation.definition.comment"],
+        "settings": {"foreground": "#6A9955", "fontStyle": "italic"}
+    },
+    {
+        "name": "String", 
+        "scope": ["string"],
+        "settings": {"foreground": "#CE9178"}
+    }
+]
+
+Include colors for: comments, strings, keywords, functions, variables, constants, types, numbers."""
+
+# Key color pairs checked for WCAG contrast: (background, foreground, min ratio)
+_CONTRAST_PAIRS = (
+    ('editor.background', 'editor.foreground', 7.0),  # WCAG AAA
+    ('activityBar.background', 'activityBar.foreground', 4.5),  # WCAG AA
+    ('sideBar.background', 'sideBar.foreground', 4.5),
+    ('statusBar.background', 'statusBar.foreground', 4.5),
+    ('terminal.background', 'terminal.foreground', 7.0),
+    ('button.background', 'button.foreground', 4.5),
+    ('input.background', 'input.foreground', 4.5),
+    ('dropdown.background', 'dropdown.foreground', 4.5),
+    ('list.activeSelectionBackground', 'list.activeSelectionForeground', 4.5),
+)
+
+
+@lru_cache(maxsize=1024)
+def _color_key_kind(key: str) -> str:
+    """Classify a workbench color key as background, foreground or other"""
+    if 'background' in key:
+        return 'background'
+    if 'foreground' in key:
+        return 'foreground'
+    return 'other'
+
 class AIEnhancer:
     """Enhances themes using AI for better colors and descriptions"""
 
+    # Prompt name -> (user prompt, system prompt or None), written to the prompt folder if missing
+    _PROMPT_TEMPLATES = {
+        'enhance_theme_description': (DESCRIPTION_USER_PROMPT, DESCRIPTION_SYSTEM_PROMPT),
+        'enhance_theme_all': (ENHANCE_ALL_USER_PROMPT, ENHANCE_ALL_SYSTEM_PROMPT),
+        'optimize_theme_colors': (OPTIMIZE_COLORS_USER_PROMPT, OPTIMIZE_COLORS_SYSTEM_PROMPT),
+        'generate_token_colors': (TOKEN_COLORS_USER_PROMPT, None),
+    }
+
     def __init__(self, config):
         self.config = config
         self.theme_ai_config = config.get('ai', {})
+        # Resolved once; prompt texts live in files under this folder
+        self._prompt_folder = config.get('ai_manager.prompt_folder', './prompts')
+        # Part of every cache key: responses made with another prompt folder never match
+        self._prompt_folder_key = os.path.realpath(self._prompt_folder)
         
         logger.info("=== AI Enhancer Initialization ===")
         # Don't try to JSON serialize the config object directly
@@ -40,6 +234,8 @@ class AIEnhancer:
             
             if ai_manager_config:
                 try:
+                    # Imported here so runs with AI disabled never load the AI SDKs
+                    from wl_ai_manager import AIManager
                     self.ai_manager = AIManager(ai_manager_config)
                     logger.info("✓ AI Manager initialized successfully")
                 except Exception as e:
@@ -52,10 +248,174 @@ class AIEnhancer:
             logger.info("AI enhancement disabled by configuration")
             self.ai_manager = None
 
+        # Prompt files are materialized once here, never on the per-call path
+        if self.ai_manager:
+            self._ensure_prompts()
+            # JIT the contrast/saturation kernels up front (no-op without numba)
+            warm_up_color_kernels()
+
+        # Raw AI responses, one JSON file per prompt name + prompt data hash so
+        # concurrent instances and processes never rewrite each other's entries
+        self._cache_enabled = bool(config.get('advanced.cache_ai_responses', False))
+        self._cache_dir = Path(config.get('advanced.cache_dir', './.cache')) / 'ai_responses'
+        self._cache_max_entries = int(config.get('advanced.cache_max_entries', 500))
+        self._cache_max_age = float(config.get('advanced.cache_max_age_days', 30)) * 86400
+        self._chat_model = config.get('ai_manager.openai.chat_model', 'default')
+        self._cache = {}
+        self._cache_pruned = False
+        self._cache_lock = threading.Lock()
+
+        # Concurrent enhancement calls share one AI client; serialize them if it isn't thread-safe
+        if self.theme_ai_config.get('serialize_requests', False):
+            self._chat_lock = threading.Lock()
+        else:
+            self._chat_lock = contextlib.nullcontext()
+
+    def _cache_key(self, prompt_name: str, payload: str) -> str:
+        """Build a cache key (also the entry's file stem) from the prompt name and its input"""
+        return f"{prompt_name}-{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+    def _read_cache_entry(self, key: str) -> Optional[str]:
+        """Read one cached response from disk, or None if missing or expired"""
+        path = self._cache_dir / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self._cache_max_age:
+                return None
+            return path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def _write_cache_entry(self, key: str, text: str):
+        """Atomically write one cached response: temp file in the same directory, then replace"""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, prefix=f".{key}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self._cache_dir / f"{key}.json")
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def _prune_cache(self):
+        """Drop expired entries and the oldest ones past the size bound, once per instance"""
+        if self._cache_pruned:
+            return
+        self._cache_pruned = True
+        entries = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith('.json'):
+                with contextlib.suppress(OSError):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort(reverse=True)
+        now = time.time()
+        for idx, (mtime, path) in enumerate(entries):
+            if idx >= self._cache_max_entries or now - mtime > self._cache_max_age:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+
+    def _get_cached_result(self, prompt_name: str, payload: str) -> Any:
+        """Return a cached AI result, or None on a miss"""
+        if not self._cache_enabled:
+            return None
+        key = self._cache_key(prompt_name, payload)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = self._read_cache_entry(key)
+            if cached is None:
+                return None
+            with self._cache_lock:
+                self._cache[key] = cached
+        try:
+            # Stored as JSON text so every hit returns fresh, independent objects
+            result = json.loads(cached)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable AI cache entry {key}: {e}")
+            return None
+        logger.info(f"Using cached AI result for {prompt_name}")
+        return result
+
+    def _set_cached_result(self, prompt_name: str, payload: str, result: Any):
+        """Store an AI result in memory and as its own file on disk"""
+        if not self._cache_enabled:
+            return
+        key = self._cache_key(prompt_name, payload)
+        text = json.dumps(result)
+        with self._cache_lock:
+            self._cache[key] = text
+            try:
+                self._write_cache_entry(key, text)
+                self._prune_cache()
+            except OSError as e:
+                logger.warning(f"Failed to write AI cache entry in {self._cache_dir}: {e}")
+
+    def _prompt_version(self, prompt_name: str) -> str:
+        """Identify the current prompt template files by folder and modification times"""
+        mtimes = []
+        for suffix in ('user', 'system'):
+            try:
+                mtimes.append(os.stat(os.path.join(self._prompt_folder, f"{prompt_name}.{suffix}.txt")).st_mtime_ns)
+            except OSError:
+                mtimes.append(0)
+        return f"{self._prompt_folder_key}:{mtimes[0]}.{mtimes[1]}"
+
+    def _cached_chat(self, prompt_name: str, prompt_data: Dict[str, Any]) -> Optional[str]:
+        """Call the AI manager, reusing the stored response for an identical prompt"""
+        payload = None
+        if self._cache_enabled:
+            # Editing a prompt template or switching models must not reuse old responses
+            payload = (f"{self._chat_model}|{self._prompt_version(prompt_name)}|"
+                       f"{json.dumps(prompt_data, sort_keys=True)}")
+            cached = self._get_cached_result(prompt_name, payload)
+            if cached is not None:
+                return cached
+
+        with self._chat_lock:
+            response = self.ai_manager.chat(prompt_name, prompt_data)
+        if response and payload is not None:
+            self._set_cached_result(prompt_name, payload, response)
+        return response
+
+    def _ensure_prompts(self):
+        """Create the prompt folder and any missing default prompt files, once"""
+        prompts_dir = self._prompt_folder
+        os.makedirs(prompts_dir, exist_ok=True)
+
+        # Use naming convention: <prompt name>.user.txt / <prompt name>.system.txt
+        for name, (user_prompt, system_prompt) in self._PROMPT_TEMPLATES.items():
+            for suffix, content in (('user', user_prompt), ('system', system_prompt)):
+                if content is None:
+                    continue
+                prompt_file = os.path.join(prompts_dir, f"{name}.{suffix}.txt")
+                if not os.path.isfile(prompt_file):
+                    Path(prompt_file).write_text(content)
+                    logger.info(f"Created prompt file: {prompt_file}")
+
     def enhance_theme(self, theme_def: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhance a theme definition with AI"""
+        """Enhance a theme definition with AI.
+
+        Also works when the calling thread already runs an event loop (Jupyter,
+        async hosts): the coroutine then runs on a worker thread and this call
+        blocks that loop until done. Async code should await enhance_theme_async.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.enhance_theme_async(theme_def))
+        # asyncio.run() can't nest inside a running loop; give it its own thread
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.enhance_theme_async(theme_def)).result()
+
+    async def enhance_theme_async(self, theme_def: Dict[str, Any]) -> Dict[str, Any]:
+        """Enhance a theme definition with AI, running independent AI calls concurrently"""
         logger.info("=== Starting Theme Enhancement ===")
-        logger.info(f"Original theme_def keys: {list(theme_def.keys())}")
+        # Key listings and AI responses are only formatted when they will be logged
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info(f"Original theme_def keys: {list(theme_def.keys())}")
         
         if not self.ai_manager:
             logger.info("AI enhancement disabled - returning original theme")
@@ -63,40 +423,76 @@ class AIEnhancer:
 
         theme_data = theme_def.get('theme', theme_def)
         logger.info(f"Theme name: {theme_data.get('name', 'Unknown')}")
-        logger.info(f"Theme data keys: {list(theme_data.keys())}")
+        if log_info:
+            logger.info(f"Theme data keys: {list(theme_data.keys())}")
         
         ai_settings = theme_data.get('ai_enhance', {})
         # Don't try to JSON serialize if it might contain non-serializable objects
         logger.info(f"AI Enhancement enabled: {ai_settings.get('enabled', True)}")
+        if not ai_settings.get('enabled', True):
+            logger.info("AI enhancement disabled for this theme - returning it unchanged")
+            return {'theme': theme_data}
         
         # Track what we're enhancing
         enhancements_made = []
 
-        # Enhance description
-        if ai_settings.get('enhance_description', True):
+        loop = asyncio.get_running_loop()
+        original_desc = theme_data.get('description', '')
+        # The AI helpers never mutate the colors they are given, so the original
+        # palette can be shared with them and compared against without copying
+        original_colors = theme_data.get('colors', {})
+
+        want_desc = ai_settings.get('enhance_description', True)
+        want_colors = ai_settings.get('optimize_colors', True)
+        want_tokens = ai_settings.get('generate_token_colors', True) and not theme_data.get('token_colors')
+
+        # Ask for everything in one AI round trip when more than one part is needed
+        combined = {}
+        if want_desc + want_colors + want_tokens > 1:
+            logger.info(">>> Requesting combined enhancement...")
+            combined = await loop.run_in_executor(
+                None, self._enhance_all, theme_data.get('name', ''), original_desc, original_colors
+            )
+
+        # Anything the combined response didn't cover falls back to its own AI
+        # call; those don't depend on each other, so run them concurrently
+        desc_task = colors_task = tokens_task = None
+
+        if want_desc and 'description' not in combined:
             logger.info(">>> Enhancing description...")
-            original_desc = theme_data.get('description', '')
-            theme_data['description'] = self._enhance_description(
-                theme_data.get('name', ''),
-                original_desc
+            desc_task = loop.run_in_executor(
+                None, self._enhance_description, theme_data.get('name', ''), original_desc
             )
+
+        if want_colors and 'colors' not in combined:
+            logger.info(">>> Optimizing colors...")
+            colors_task = loop.run_in_executor(None, self._optimize_colors, original_colors)
+
+        if want_tokens and 'token_colors' not in combined:
+            logger.info(">>> Generating token colors...")
+            tokens_task = loop.run_in_executor(None, self._generate_token_colors, original_colors)
+
+        pending = [task for task in (desc_task, colors_task, tokens_task) if task is not None]
+        if pending:
+            await asyncio.gather(*pending)
+
+        # Enhance description
+        if want_desc:
+            theme_data['description'] = combined['description'] if desc_task is None else desc_task.result()
             if theme_data['description'] != original_desc:
                 enhancements_made.append('description')
                 logger.info(f"✓ Description enhanced: '{original_desc}' -> '{theme_data['description']}'")
 
         # Optimize colors
-        if ai_settings.get('optimize_colors', True):
-            logger.info(">>> Optimizing colors...")
-            original_colors = theme_data.get('colors', {}).copy()
-            theme_data['colors'] = self._optimize_colors(original_colors)
-            if theme_data['colors'] != original_colors:
+        if want_colors:
+            theme_data['colors'], colors_changed = combined['colors'] if colors_task is None else colors_task.result()
+            if colors_changed:
                 enhancements_made.append('colors')
                 logger.info(f"✓ Colors optimized - {len(theme_data['colors'])} total colors")
 
         # Generate missing token colors
-        if ai_settings.get('generate_token_colors', True) and not theme_data.get('token_colors'):
-            logger.info(">>> Generating token colors...")
-            theme_data['token_colors'] = self._generate_token_colors(theme_data.get('colors', {}))
+        if want_tokens:
+            theme_data['token_colors'] = combined['token_colors'] if tokens_task is None else tokens_task.result()
             if theme_data['token_colors']:
                 enhancements_made.append('token_colors')
                 logger.info(f"✓ Generated {len(theme_data['token_colors'])} token colors")
@@ -104,9 +500,8 @@ class AIEnhancer:
         # Check contrast ratios
         if ai_settings.get('contrast_check', True):
             logger.info(">>> Checking contrast ratios...")
-            original_colors = theme_data.get('colors', {}).copy()
-            theme_data['colors'] = self._check_and_fix_contrast(original_colors)
-            if theme_data['colors'] != original_colors:
+            theme_data['colors'], contrast_fixed = self._check_and_fix_contrast(theme_data.get('colors', {}))
+            if contrast_fixed:
                 enhancements_made.append('contrast')
                 logger.info("✓ Contrast ratios fixed")
 
@@ -122,47 +517,52 @@ class AIEnhancer:
 
         logger.info(f"=== Enhancement Complete ===")
         logger.info(f"Enhancements made: {enhancements_made}")
-        logger.info(f"Final theme_data keys: {list(theme_data.keys())}")
+        if log_info:
+            logger.info(f"Final theme_data keys: {list(theme_data.keys())}")
         
         # Make sure we return the enhanced theme in the right structure
         result = {'theme': theme_data}
-        logger.info(f"Returning enhanced theme with structure: {list(result.keys())}")
+        if log_info:
+            logger.info(f"Returning enhanced theme with structure: {list(result.keys())}")
         
         return result
 
+    def _enhance_all(self, theme_name: str, current_description: str,
+                     colors: Dict[str, str]) -> Dict[str, Any]:
+        """Request description, color and token color enhancements in a single AI call"""
+        logger.info(f"_enhance_all called with: name='{theme_name}', {len(colors)} colors")
+
+        try:
+            key_colors = {
+                'background': colors.get('editor.background', '#1e1e1e'),
+                'foreground': colors.get('editor.foreground', '#d4d4d4'),
+                'accent': colors.get('activityBar.background', '#007acc'),
+            }
+            prompt_data = {
+                'theme_name': theme_name,
+                'description': current_description,
+                'colors': json.dumps(colors, indent=2),
+                'base_colors': json.dumps(key_colors, indent=2)
+            }
+
+            response = self._cached_chat('enhance_theme_all', prompt_data)
+            if not response:
+                logger.warning("No response from AI for combined enhancement")
+                return {}
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"AI combined enhancement response: {response[:500]}...")
+            return self._parse_combined_response(response, current_description, colors)
+
+        except Exception as e:
+            logger.error(f"Failed to run combined enhancement: {e}", exc_info=True)
+            return {}
+
     def _enhance_description(self, theme_name: str, current_description: str) -> str:
         """Use AI to enhance theme description"""
         logger.info(f"_enhance_description called with: name='{theme_name}', desc='{current_description}'")
         
         try:
-            # Create prompt file if needed
-            prompts_dir = Path(self.config.get('ai_manager.prompt_folder', './prompts'))
-            prompts_dir.mkdir(exist_ok=True)
-
-            # Use naming convention: enhance_theme_description.user.txt
-            prompt_file = prompts_dir / 'enhance_theme_description.user.txt'
-            if not prompt_file.exists():
-                prompt_content = """Enhance this VS Code theme description to be more engaging and descriptive.
-Keep it concise but compelling, under 200 characters.
-
-Theme: {theme_name}
-Current description: {description}
-
-Provide an enhanced description that:
-- Highlights the unique visual characteristics
-- Mentions the target audience or use case
-- Uses vivid but professional language
-- Stays under 200 characters"""
-                prompt_file.write_text(prompt_content)
-                logger.info(f"Created prompt file: {prompt_file}")
-                
-            # Also create system prompt
-            system_prompt_file = prompts_dir / 'enhance_theme_description.system.txt'
-            if not system_prompt_file.exists():
-                system_content = """You are a marketing copywriter specializing in developer tools. Create compelling, concise descriptions for VS Code themes."""
-                system_prompt_file.write_text(system_content)
-                logger.info(f"Created system prompt file: {system_prompt_file}")
-
             # Data for templating - NO SPACES in keys!
             prompt_data = {
                 'theme_name': theme_name,
@@ -172,9 +572,10 @@ Provide an enhanced description that:
             logger.info(f"Calling AI with theme_name='{theme_name}', description='{current_description}'")
 
             # Call with 'enhance_theme_description'
-            response = self.ai_manager.chat('enhance_theme_description', prompt_data)
+            response = self._cached_chat('enhance_theme_description', prompt_data)
             
-            logger.info(f"AI Response: {response}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"AI Response: {response}")
             
             enhanced_description = response.strip() if response else current_description
 
@@ -189,118 +590,54 @@ Provide an enhanced description that:
             logger.error(f"Failed to enhance description: {e}", exc_info=True)
             return current_description
 
-    def _optimize_colors(self, colors: Dict[str, str]) -> Dict[str, str]:
-        """Use AI to optimize theme colors"""
+    def _optimize_colors(self, colors: Dict[str, str]) -> Tuple[Dict[str, str], bool]:
+        """Use AI to optimize theme colors, returning (colors, changed)"""
         logger.info(f"_optimize_colors called with {len(colors)} colors")
         
         try:
-            # Create prompt file if needed
-            prompts_dir = Path(self.config.get('ai_manager.prompt_folder', './prompts'))
-            prompts_dir.mkdir(exist_ok=True)
-
-            prompt_file = prompts_dir / 'optimize_theme_colors.user.txt'
-            if not prompt_file.exists():
-                prompt_content = """Review these VS Code theme colors and suggest optimizations.
-
-Current colors:
-{colors}
-
-Analyze for:
-1. Contrast ratios (WCAG compliance)
-2. Color harmony
-3. Eye strain reduction
-4. Consistency across UI elements
-
-Return a Python dictionary with any color changes needed. Example:
-{
-    "editor.background": "#1a1a1a",
-    "editor.foreground": "#e0e0e0"
-}
-
-Only include colors that need to be changed."""
-                prompt_file.write_text(prompt_content)
-                logger.info(f"Created prompt file: {prompt_file}")
-                
-            # Also create system prompt
-            system_prompt_file = prompts_dir / 'optimize_theme_colors.system.txt'
-            if not system_prompt_file.exists():
-                system_content = """You are a color theory and accessibility expert for VS Code themes. Analyze color schemes for contrast, harmony, and usability. Return only valid Python code."""
-                system_prompt_file.write_text(system_content)
-                logger.info(f"Created system prompt file: {system_prompt_file}")
-
             # Format colors for AI
-            colors_json = json.dumps(colors, indent=2)
             prompt_data = {
-                'colors': colors_json
+                'colors': json.dumps(colors, indent=2)
             }
             
             logger.info(f"Calling AI to optimize colors...")
-            logger.debug(f"Current colors sample: {list(colors.items())[:5]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Current colors sample: {list(colors.items())[:5]}")
 
-            response = self.ai_manager.chat('optimize_theme_colors', prompt_data)
+            response = self._cached_chat('optimize_theme_colors', prompt_data)
             
-            if response:
-                logger.info(f"AI color optimization response: {response[:500]}...")
-            else:
+            if not response:
                 logger.warning("No response from AI for color optimization")
-                return colors
+                return colors, False
+            log_info = logger.isEnabledFor(logging.INFO)
+            if log_info:
+                logger.info(f"AI color optimization response: {response[:500]}...")
 
             # Parse AI suggestions
             optimized_colors = self._parse_color_suggestions(response, colors)
 
             logger.info(f"Optimized {len(optimized_colors)} colors")
-            changes = []
-            for key in optimized_colors:
-                if key in colors and optimized_colors[key] != colors[key]:
-                    changes.append(f"{key}: {colors[key]} -> {optimized_colors[key]}")
+            changes = [key for key in optimized_colors
+                       if key in colors and optimized_colors[key] != colors[key]]
             
-            if changes:
+            if changes and log_info:
                 logger.info("Color changes made:")
-                for change in changes[:10]:  # Show first 10 changes
-                    logger.info(f"  {change}")
+                for key in changes[:10]:  # Show first 10 changes
+                    logger.info(f"  {key}: {colors[key]} -> {optimized_colors[key]}")
                 if len(changes) > 10:
                     logger.info(f"  ... and {len(changes) - 10} more")
             
-            return optimized_colors
+            return optimized_colors, bool(changes)
 
         except Exception as e:
             logger.error(f"Failed to optimize colors: {e}", exc_info=True)
-            return colors
+            return colors, False
 
     def _generate_token_colors(self, base_colors: Dict[str, str]) -> List[Dict[str, Any]]:
         """Generate token colors based on theme colors"""
         logger.info("_generate_token_colors called")
         
         try:
-            # Create prompt file if needed
-            prompts_dir = Path(self.config.get('ai_manager.prompt_folder', './prompts'))
-            prompts_dir.mkdir(exist_ok=True)
-
-            prompt_file = prompts_dir / 'generate_token_colors.user.txt'
-            if not prompt_file.exists():
-                prompt_content = """Based on these base colors, generate token colors for syntax highlighting.
-
-Base colors:
-{base_colors}
-
-Create a Python list of dictionaries for VS Code token colors. Example format:
-[
-    {
-        "name": "Comment",
-        "scope": ["comment", "punctuation.definition.comment"],
-        "settings": {"foreground": "#6A9955", "fontStyle": "italic"}
-    },
-    {
-        "name": "String", 
-        "scope": ["string"],
-        "settings": {"foreground": "#CE9178"}
-    }
-]
-
-Include colors for: comments, strings, keywords, functions, variables, constants, types, numbers."""
-                prompt_file.write_text(prompt_content)
-                logger.info(f"Created prompt file: {prompt_file}")
-
             # Get key colors for generation
             key_colors = {
                 'background': base_colors.get('editor.background', '#1e1e1e'),
@@ -308,21 +645,27 @@ Include colors for: comments, strings, keywords, functions, variables, constants
                 'accent': base_colors.get('activityBar.background', '#007acc'),
             }
             
+            base_colors_json = json.dumps(key_colors, indent=2)
             prompt_data = {
-                'base_colors': json.dumps(key_colors, indent=2)
+                'base_colors': base_colors_json
             }
             
-            logger.info(f"Generating token colors based on: {json.dumps(key_colors, indent=2)}")
+            logger.info(f"Generating token colors based on: {base_colors_json}")
 
-            response = self.ai_manager.chat('generate_token_colors', prompt_data)
+            response = self._cached_chat('generate_token_colors', prompt_data)
+            if not response:
+                logger.warning("No response from AI for token colors")
+                return self._get_fallback_token_colors(base_colors)
             
-            logger.info(f"AI token colors response: {response[:500]}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"AI token colors response: {response[:500]}...")
             
             token_colors = self._parse_token_colors(response)
 
             logger.info(f"Generated {len(token_colors)} token colors")
-            for tc in token_colors[:3]:  # Show first 3
-                logger.debug(f"  Token: {tc.get('name', 'unnamed')} - {tc.get('scope', [])}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for tc in token_colors[:3]:  # Show first 3
+                    logger.debug(f"  Token: {tc.get('name', 'unnamed')} - {tc.get('scope', [])}")
             
             return token_colors
 
@@ -330,45 +673,36 @@ Include colors for: comments, strings, keywords, functions, variables, constants
             logger.error(f"Failed to generate token colors: {e}", exc_info=True)
             return self._get_fallback_token_colors(base_colors)
 
-    def _check_and_fix_contrast(self, colors: Dict[str, str]) -> Dict[str, str]:
-        """Check and fix contrast ratios for accessibility"""
+    def _check_and_fix_contrast(self, colors: Dict[str, str]) -> Tuple[Dict[str, str], bool]:
+        """Check and fix contrast ratios for accessibility, returning (colors, fixed)"""
         logger.info("_check_and_fix_contrast called")
         
-        fixed_colors = colors.copy()
+        # Fixed colors are collected here and merged only if anything changed
+        overlay = {}
         fixes_made = []
 
-        # Key color pairs to check
-        contrast_pairs = [
-            ('editor.background', 'editor.foreground', 7.0),  # WCAG AAA
-            ('activityBar.background', 'activityBar.foreground', 4.5),  # WCAG AA
-            ('sideBar.background', 'sideBar.foreground', 4.5),
-            ('statusBar.background', 'statusBar.foreground', 4.5),
-            ('terminal.background', 'terminal.foreground', 7.0),
-            ('button.background', 'button.foreground', 4.5),
-            ('input.background', 'input.foreground', 4.5),
-            ('dropdown.background', 'dropdown.foreground', 4.5),
-            ('list.activeSelectionBackground', 'list.activeSelectionForeground', 4.5),
+        # Only check pairs where both colors are present and valid
+        pairs = [
+            (bg_key, fg_key, min_ratio)
+            for bg_key, fg_key, min_ratio in _CONTRAST_PAIRS
+            if bg_key in colors and fg_key in colors
+            and _is_hex_color(colors[bg_key]) and _is_hex_color(colors[fg_key])
         ]
 
-        for bg_key, fg_key, min_ratio in contrast_pairs:
-            if bg_key in colors and fg_key in colors:
-                bg_color = colors[bg_key]
-                fg_color = colors[fg_key]
-
-                # Validate colors
-                if not validate_hex_color(bg_color) or not validate_hex_color(fg_color):
-                    continue
-
-                ratio = calculate_contrast_ratio(bg_color, fg_color)
-
-                if ratio < min_ratio:
-                    logger.warning(f"Low contrast ratio {ratio:.2f} for {bg_key}/{fg_key} (min: {min_ratio})")
-
-                    # Try to fix by adjusting foreground brightness
-                    fixed_fg = self._adjust_for_contrast(bg_color, fg_color, min_ratio)
-                    if fixed_fg and fixed_fg != fg_color:
-                        fixed_colors[fg_key] = fixed_fg
-                        fixes_made.append(f"{fg_key}: {fg_color} -> {fixed_fg} (ratio: {ratio:.2f} -> {calculate_contrast_ratio(bg_color, fixed_fg):.2f})")
+        # At most a handful of pairs sharing a few colors: the per-color
+        # luminance cache beats building arrays for a vectorized pass
+        for bg_key, fg_key, min_ratio in pairs:
+            bg_color = colors[bg_key]
+            fg_color = colors[fg_key]
+            ratio = calculate_contrast_ratio(bg_color, fg_color)
+            if ratio < min_ratio:
+                logger.warning(f"Low contrast ratio {ratio:.2f} for {bg_key}/{fg_key} (min: {min_ratio})")
+
+                # Try to fix by adjusting foreground brightness
+                fixed_fg = self._adjust_for_contrast(bg_color, fg_color, min_ratio)
+                if fixed_fg and fixed_fg != fg_color:
+                    overlay[fg_key] = fixed_fg
+                    fixes_made.append(f"{fg_key}: {fg_color} -> {fixed_fg} (ratio: {ratio:.2f} -> {calculate_contrast_ratio(bg_color, fixed_fg):.2f})")
 
         if fixes_made:
             logger.info(f"Fixed {len(fixes_made)} contrast issues:")
@@ -377,24 +711,18 @@ Include colors for: comments, strings, keywords, functions, variables, constants
         else:
             logger.info("No contrast issues found")
 
-        return fixed_colors
+        if not overlay:
+            return colors, False
+        return {**colors, **overlay}, True
 
     def _adjust_for_contrast(self, bg_color: str, fg_color: str, target_ratio: float) -> str:
         """Adjust foreground color to meet contrast ratio"""
-        # Try brightening and darkening
-        for adjustment in range(10, 100, 10):
-            # Try brighter
-            brighter = adjust_brightness(fg_color, adjustment)
-            if calculate_contrast_ratio(bg_color, brighter) >= target_ratio:
-                return brighter
-
-            # Try darker
-            darker = adjust_brightness(fg_color, -adjustment)
-            if calculate_contrast_ratio(bg_color, darker) >= target_ratio:
-                return darker
-
-        # If we can't fix it, return original
-        return fg_color
+        # Brightness search runs in a JIT-compiled kernel when numba is available
+        fixed = _adjust_for_contrast_rgb(*hex_to_rgb(bg_color), *hex_to_rgb(fg_color), target_ratio)
+        if fixed == hex_to_rgb(fg_color):
+            # If we can't fix it, return original
+            return fg_color
+        return rgb_to_hex(*fixed)
 
     def _generate_color_variants(self, theme_data: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
         """Generate color variants (light/dark/high-contrast)"""
@@ -419,122 +747,193 @@ Include colors for: comments, strings, keywords, functions, variables, constants
         """Check if theme is dark based on background color"""
         bg_color = colors.get('editor.background', '#ffffff')
         # Simple check: dark if background brightness < 50%
-        return get_brightness(bg_color) < 0.5
+        return is_dark_rgb(*hex_to_rgb(bg_color))
 
     def _generate_light_variant(self, colors: Dict[str, str]) -> Dict[str, str]:
         """Generate light variant from dark theme"""
-        light_colors = {}
-
+        # Invalid colors pass through unchanged; valid ones are overwritten below
+        light_colors = dict(colors)
+
+        # Palettes repeat the same value across many keys, and the result only
+        # depends on the value and whether the key is a background/foreground,
+        # so compute each distinct (color, kind) pair once and fan it out
+        valid = {color for color in set(colors.values()) if _is_hex_color(color)}
+        groups = {}
         for key, color in colors.items():
-            if not validate_hex_color(color):
-                light_colors[key] = color
-                continue
-
-            brightness = get_brightness(color)
-
-            if 'background' in key:
-                # Light backgrounds
-                if brightness < 0.2:
-                    light_colors[key] = '#ffffff'
-                elif brightness < 0.5:
-                    light_colors[key] = adjust_brightness(color, 80)
-                else:
-                    light_colors[key] = adjust_brightness(color, 40)
-
-            elif 'foreground' in key:
-                # Dark foregrounds
-                if brightness > 0.8:
-                    light_colors[key] = '#000000'
-                elif brightness > 0.5:
-                    light_colors[key] = adjust_brightness(color, -80)
-                else:
-                    light_colors[key] = adjust_brightness(color, -40)
-
-            else:
-                # Adjust other colors based on brightness
-                if brightness < 0.5:
-                    light_colors[key] = adjust_brightness(color, 40)
-                else:
-                    light_colors[key] = adjust_brightness(color, -40)
+            if color in valid:
+                groups.setdefault((color, _color_key_kind(key)), []).append(key)
+
+        if not groups:
+            return light_colors
+
+        pairs = list(groups)
+        rgb = hex_to_rgb_array([color for color, _ in pairs])
+        # Perceived brightness in integer units (0.5 -> 127500)
+        brightness = brightness_int_array(rgb)
+        is_background = np.array([kind == 'background' for _, kind in pairs])
+        is_foreground = np.array([kind == 'foreground' for _, kind in pairs])
+        is_dark = brightness < 127500
+
+        # Light backgrounds, dark foregrounds, other colors based on brightness
+        percent = np.select(
+            [is_background & is_dark, is_background,
+             is_foreground & (brightness > 127500), is_foreground,
+             is_dark],
+            [80, 40, -80, -40, 40],
+            default=-40
+        )
+        adjusted = adjust_brightness_array(rgb, percent)
+
+        # Very dark backgrounds become white, very light foregrounds black
+        adjusted[is_background & (brightness < 51000)] = 255
+        adjusted[is_foreground & (brightness > 204000)] = 0
+
+        for pair, new_color in zip(pairs, rgb_array_to_hex(adjusted)):
+            for key in groups[pair]:
+                light_colors[key] = new_color
 
         return light_colors
 
     def _generate_high_contrast_variant(self, colors: Dict[str, str]) -> Dict[str, str]:
         """Generate high contrast variant"""
-        hc_colors = colors.copy()
-
-        # Maximize contrast for key pairs
+        # The variant is a separate palette, so it is always a new dict; the
+        # copy and the black/white overrides are built in a single pass
         if 'editor.background' in colors:
-            bg = colors['editor.background']
             # Make background pure black or white
-            if get_brightness(bg) < 0.5:
-                hc_colors['editor.background'] = '#000000'
-                hc_colors['editor.foreground'] = '#ffffff'
-                hc_colors['sideBar.background'] = '#000000'
-                hc_colors['activityBar.background'] = '#000000'
-                hc_colors['statusBar.background'] = '#000000'
-                hc_colors['terminal.background'] = '#000000'
+            if is_dark_rgb(*hex_to_rgb(colors['editor.background'])):
+                hc_colors = {**colors, **_HC_DARK_OVERRIDES}
             else:
-                hc_colors['editor.background'] = '#ffffff'
-                hc_colors['editor.foreground'] = '#000000'
-                hc_colors['sideBar.background'] = '#ffffff'
-                hc_colors['activityBar.background'] = '#ffffff'
-                hc_colors['statusBar.background'] = '#ffffff'
-                hc_colors['terminal.background'] = '#ffffff'
-
-        # Increase saturation for accent colors
-        accent_keys = ['activityBarBadge.background', 'button.background',
-                       'progressBar.background', 'selection.background']
-        for key in accent_keys:
-            if key in hc_colors:
-                hc_colors[key] = saturate_color(hc_colors[key], 0.5)
+                hc_colors = {**colors, **_HC_LIGHT_OVERRIDES}
+        else:
+            hc_colors = colors.copy()
+
+        # Increase saturation for accent colors, all in one vectorized pass
+        accent_keys = [key for key in _HC_ACCENT_KEYS
+                       if key in hc_colors and _is_hex_color(hc_colors[key])]
+        if accent_keys:
+            rgb = hex_to_rgb_array([hc_colors[key] for key in accent_keys])
+            for key, color in zip(accent_keys, rgb_array_to_hex(saturate_array(rgb, 0.5))):
+                hc_colors[key] = color
 
         return hc_colors
 
+    def _parse_combined_response(self, ai_response: str, current_description: str,
+                                 colors: Dict[str, str]) -> Dict[str, Any]:
+        """Parse a combined {description, colors, token_colors} AI response"""
+        start = ai_response.find('{')
+        end = ai_response.rfind('}')
+        if start == -1 or end < start:
+            logger.warning("No JSON object found in combined AI response")
+            return {}
+
+        obj_str = ai_response[start:end + 1]
+        try:
+            parsed = json.loads(obj_str)
+        except json.JSONDecodeError:
+            try:
+                parsed = ast.literal_eval(obj_str)
+            except (ValueError, SyntaxError) as e:
+                logger.warning(f"Failed to parse combined AI response: {e}")
+                return {}
+
+        if not isinstance(parsed, dict):
+            return {}
+
+        result = {}
+
+        description = parsed.get('description')
+        if isinstance(description, str) and description.strip():
+            enhanced_description = description.strip()
+            if len(enhanced_description) > 200:
+                enhanced_description = enhanced_description[:197] + "..."
+            result['description'] = enhanced_description
+
+        suggested_colors = parsed.get('colors')
+        if isinstance(suggested_colors, dict):
+            # (colors, changed), the same shape _optimize_colors returns
+            result['colors'] = self._apply_color_suggestions(suggested_colors, colors)
+
+        token_items = parsed.get('token_colors')
+        if isinstance(token_items, list):
+            token_colors = self._collect_token_colors(token_items)
+            if token_colors:
+                result['token_colors'] = token_colors
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Combined AI response provided: {list(result.keys())}")
+        return result
+
+    def _apply_color_suggestions(self, suggestions: Dict[str, Any],
+                                 original_colors: Dict[str, str]) -> Tuple[Dict[str, str], bool]:
+        """Apply valid AI color suggestions on top of the original colors, returning (colors, changed)"""
+        # Copied on the first real change; unchanged palettes are returned as-is
+        optimized = original_colors
+        for key, color in suggestions.items():
+            color = str(color)
+            if key in original_colors and _is_hex_color(color):
+                logger.debug(f"AI suggested {key}: {color}")
+                if color != original_colors[key]:
+                    if optimized is original_colors:
+                        optimized = original_colors.copy()
+                    optimized[key] = color
+        return optimized, optimized is not original_colors
+
+    def _collect_token_colors(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """Keep well-formed token color entries, normalizing scope to a list"""
+        token_colors = []
+        for item in items:
+            if isinstance(item, dict) and 'scope' in item and 'settings' in item:
+                # Ensure scope is a list
+                if isinstance(item['scope'], str):
+                    item['scope'] = [item['scope']]
+                token_colors.append(item)
+        return token_colors
+
     def _parse_color_suggestions(self, ai_response: str, original_colors: Dict[str, str]) -> Dict[str, str]:
-        """Parse AI color suggestions from response"""
+        """Parse AI color suggestions from response (the original dict if nothing applies)"""
         logger.info("_parse_color_suggestions called")
         
-        optimized = original_colors.copy()
+        optimized = original_colors
+
+        # Most responses are JSON: decode the first object in place, no regex or
+        # Python-literal parsing needed
+        start = ai_response.find('{')
+        if start != -1:
+            try:
+                parsed_dict, _ = _JSON_DECODER.raw_decode(ai_response, start)
+            except json.JSONDecodeError:
+                parsed_dict = None
+            if isinstance(parsed_dict, dict):
+                optimized, _ = self._apply_color_suggestions(parsed_dict, original_colors)
+                return optimized
 
         # Try to extract dictionary from response
-        import re
-        import ast
-        
-        # Look for Python dictionary in response
-        dict_match = re.search(r'\{[^}]*\}', ai_response, re.DOTALL)
-        
-        if dict_match:
+        # Look for a (possibly nested) Python dictionary in response
+        dict_str = _first_braced_block(ai_response, start) if start != -1 else None
+        if dict_str:
+            logger.debug(f"Found potential dict: {dict_str[:200]}...")
             try:
-                # Try to parse as Python dict
-                dict_str = dict_match.group()
-                logger.debug(f"Found potential dict: {dict_str[:200]}...")
-                
                 # Use ast.literal_eval for safe parsing
                 parsed_dict = ast.literal_eval(dict_str)
-                
-                if isinstance(parsed_dict, dict):
-                    for key, color in parsed_dict.items():
-                        if key in original_colors and validate_hex_color(str(color)):
-                            optimized[key] = str(color)
-                            logger.debug(f"AI suggested {key}: {color}")
-                            
             except (ValueError, SyntaxError) as e:
                 logger.warning(f"Failed to parse dictionary from AI response: {e}")
-                
-                # Fallback: Look for hex color patterns in response
-                lines = ai_response.split('\n')
-                
-                for line in lines:
-                    # Look for patterns like "editor.background: #123456"
-                    match = re.search(r'([a-zA-Z.]+):\s*(#[0-9A-Fa-f]{6,8})', line)
-                    if match:
-                        key = match.group(1)
-                        color = match.group(2)
-
-                        if key in original_colors and validate_hex_color(color):
-                            optimized[key] = color
-                            logger.debug(f"AI suggested {key}: {color}")
+                parsed_dict = None
+
+            if isinstance(parsed_dict, dict):
+                optimized, _ = self._apply_color_suggestions(parsed_dict, original_colors)
+                return optimized
+
+        # Fallback: Look for patterns like "editor.background: #123456"
+        for match in _SUGGEST_RE.finditer(ai_response):
+            key = match.group(1)
+            color = match.group(2)
+
+            # The pattern already matched hex digits; only 7 of them is invalid
+            if key in original_colors and len(color) != 8:
+                if optimized is original_colors:
+                    optimized = original_colors.copy()
+                optimized[key] = color
+                logger.debug(f"AI suggested {key}: {color}")
 
         return optimized
 
@@ -544,46 +943,41 @@ Include colors for: comments, strings, keywords, functions, variables, constants
         
         token_colors = []
 
-        # Try to extract JSON/Python list from response
-        import re
-        import ast
-        
-        # Look for list pattern
-        list_match = re.search(r'\[[\s\S]*\]', ai_response)
+        # Try each '[' as the start of a JSON list; raw_decode parses in place
+        # and reports where the value ends, so no substring or regex is needed
+        idx = ai_response.find('[')
+        while idx != -1:
+            try:
+                parsed, _ = _JSON_DECODER.raw_decode(ai_response, idx)
+            except json.JSONDecodeError:
+                parsed = None
+
+            if isinstance(parsed, list):
+                token_colors = self._collect_token_colors(parsed)
+                if token_colors:
+                    logger.info(f"Successfully parsed {len(token_colors)} token colors")
+                    return token_colors
 
-        if list_match:
+            idx = ai_response.find('[', idx + 1)
+
+        # Not JSON - try the outermost list as a Python literal (single quotes etc.)
+        start = ai_response.find('[')
+        end = ai_response.rfind(']')
+        if start != -1 and end > start:
+            list_str = ai_response[start:end + 1]
+            logger.debug(f"Found potential list: {list_str[:200]}...")
             try:
-                list_str = list_match.group()
-                logger.debug(f"Found potential list: {list_str[:200]}...")
-                
-                # Try ast.literal_eval first (safer)
                 parsed = ast.literal_eval(list_str)
-                
+
                 if isinstance(parsed, list):
                     # Validate structure
-                    for item in parsed:
-                        if isinstance(item, dict) and 'scope' in item and 'settings' in item:
-                            # Ensure scope is a list
-                            if isinstance(item['scope'], str):
-                                item['scope'] = [item['scope']]
-                            token_colors.append(item)
-                            
+                    token_colors = self._collect_token_colors(parsed)
+
                     logger.info(f"Successfully parsed {len(token_colors)} token colors")
                     return token_colors
-                    
+
             except (ValueError, SyntaxError) as e:
                 logger.warning(f"Failed to parse list with ast.literal_eval: {e}")
-                
-                # Try JSON parsing
-                try:
-                    parsed = json.loads(list_str)
-                    if isinstance(parsed, list):
-                        for item in parsed:
-                            if isinstance(item, dict) and 'scope' in item and 'settings' in item:
-                                token_colors.append(item)
-                        return token_colors
-                except json.JSONDecodeError as je:
-                    logger.error(f"Failed to parse JSON from AI response: {je}")
 
         # Fallback to manual parsing
         logger.warning("Falling back to manual token color parsing")
@@ -592,20 +986,20 @@ Include colors for: comments, strings, keywords, functions, variables, constants
         current_token = None
         for line in ai_response.split('\n'):
             # Look for name
-            name_match = re.search(r'name["\']?\s*:\s*["\']([^"\']+)["\']', line)
+            name_match = _NAME_RE.search(line)
             if name_match:
                 if current_token and 'scope' in current_token and 'settings' in current_token:
                     token_colors.append(current_token)
                 current_token = {'name': name_match.group(1)}
 
             # Look for scope
-            scope_match = re.search(r'scope["\']?\s*:\s*\[([^\]]+)\]', line)
+            scope_match = _SCOPE_RE.search(line)
             if scope_match and current_token:
                 scopes = [s.strip().strip('"\'') for s in scope_match.group(1).split(',')]
                 current_token['scope'] = scopes
 
             # Look for foreground color
-            fg_match = re.search(r'foreground["\']?\s*:\s*["\']?(#[0-9A-Fa-f]{6})["\']?', line)
+            fg_match = _FG_RE.search(line)
             if fg_match and current_token:
                 if 'settings' not in current_token:
                     current_token['settings'] = {}
@@ -628,165 +1022,6 @@ Include colors for: comments, strings, keywords, functions, variables, constants
         logger.info("Using fallback token colors")
         
         bg = base_colors.get('editor.background', '#1e1e1e')
-        fg = base_colors.get('editor.foreground', '#d4d4d4')
 
         # Generate colors based on background
-        is_dark = get_brightness(bg) < 0.5
-
-        if is_dark:
-            return [
-                {
-                    "name": "Comment",
-                    "scope": ["comment", "punctuation.definition.comment"],
-                    "settings": {"foreground": "#6A9955", "fontStyle": "italic"}
-                },
-                {
-                    "name": "String",
-                    "scope": ["string", "string.quoted"],
-                    "settings": {"foreground": "#ce9178"}
-                },
-                {
-                    "name": "Number",
-                    "scope": ["constant.numeric"],
-                    "settings": {"foreground": "#b5cea8"}
-                },
-                {
-                    "name": "Keyword",
-                    "scope": ["keyword", "keyword.control"],
-                    "settings": {"foreground": "#569cd6"}
-                },
-                {
-                    "name": "Storage",
-                    "scope": ["storage", "storage.type", "storage.modifier"],
-                    "settings": {"foreground": "#569cd6"}
-                },
-                {
-                    "name": "Function",
-                    "scope": ["entity.name.function", "support.function"],
-                    "settings": {"foreground": "#dcdcaa"}
-                },
-                {
-                    "name": "Variable",
-                    "scope": ["variable", "variable.other"],
-                    "settings": {"foreground": "#9cdcfe"}
-                },
-                {
-                    "name": "Class",
-                    "scope": ["entity.name.class", "entity.name.type.class", "support.class"],
-                    "settings": {"foreground": "#4ec9b0"}
-                },
-                {
-                    "name": "Interface",
-                    "scope": ["entity.name.type.interface"],
-                    "settings": {"foreground": "#4ec9b0"}
-                },
-                {
-                    "name": "Type",
-                    "scope": ["entity.name.type", "support.type"],
-                    "settings": {"foreground": "#4ec9b0"}
-                },
-                {
-                    "name": "Constant",
-                    "scope": ["constant", "constant.language", "support.constant"],
-                    "settings": {"foreground": "#569cd6"}
-                },
-                {
-                    "name": "Tag",
-                    "scope": ["entity.name.tag", "meta.tag"],
-                    "settings": {"foreground": "#569cd6"}
-                },
-                {
-                    "name": "Attribute",
-                    "scope": ["entity.other.attribute-name"],
-                    "settings": {"foreground": "#9cdcfe"}
-                },
-                {
-                    "name": "Invalid",
-                    "scope": ["invalid", "invalid.illegal"],
-                    "settings": {"foreground": "#f44747"}
-                },
-                {
-                    "name": "Invalid Deprecated",
-                    "scope": ["invalid.deprecated"],
-                    "settings": {"foreground": "#f44747", "fontStyle": "strikethrough"}
-                }
-            ]
-        else:
-            # Light theme colors
-            return [
-                {
-                    "name": "Comment",
-                    "scope": ["comment", "punctuation.definition.comment"],
-                    "settings": {"foreground": "#008000", "fontStyle": "italic"}
-                },
-                {
-                    "name": "String",
-                    "scope": ["string", "string.quoted"],
-                    "settings": {"foreground": "#a31515"}
-                },
-                {
-                    "name": "Number",
-                    "scope": ["constant.numeric"],
-                    "settings": {"foreground": "#09885a"}
-                },
-                {
-                    "name": "Keyword",
-                    "scope": ["keyword", "keyword.control"],
-                    "settings": {"foreground": "#0000ff"}
-                },
-                {
-                    "name": "Storage",
-                    "scope": ["storage", "storage.type", "storage.modifier"],
-                    "settings": {"foreground": "#0000ff"}
-                },
-                {
-                    "name": "Function",
-                    "scope": ["entity.name.function", "support.function"],
-                    "settings": {"foreground": "#795e26"}
-                },
-                {
-                    "name": "Variable",
-                    "scope": ["variable", "variable.other"],
-                    "settings": {"foreground": "#001080"}
-                },
-                {
-                    "name": "Class",
-                    "scope": ["entity.name.class", "entity.name.type.class", "support.class"],
-                    "settings": {"foreground": "#267f99"}
-                },
-                {
-                    "name": "Interface",
-                    "scope": ["entity.name.type.interface"],
-                    "settings": {"foreground": "#267f99"}
-                },
-                {
-                    "name": "Type",
-                    "scope": ["entity.name.type", "support.type"],
-                    "settings": {"foreground": "#267f99"}
-                },
-                {
-                    "name": "Constant",
-                    "scope": ["constant", "constant.language", "support.constant"],
-                    "settings": {"foreground": "#0000ff"}
-                },
-                {
-                    "name": "Tag",
-                    "scope": ["entity.name.tag", "meta.tag"],
-                    "settings": {"foreground": "#800000"}
-                },
-                {
-                    "name": "Attribute",
-                    "scope": ["entity.other.attribute-name"],
-                    "settings": {"foreground": "#ff0000"}
-                },
-                {
-                    "name": "Invalid",
-                    "scope": ["invalid", "invalid.illegal"],
-                    "settings": {"foreground": "#cd3131"}
-                },
-                {
-                    "name": "Invalid Deprecated",
-                    "scope": ["invalid.deprecated"],
-                    "settings": {"foreground": "#cd3131", "fontStyle": "strikethrough"}
-                }
-            ]
\ No newline at end of file
+        return fallback_token_colors(is_dark_rgb(*hex_to_rgb(bg)))
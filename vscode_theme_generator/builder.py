@@ -3,6 +3,7 @@ Theme Builder - Main orchestration for theme generation
 """
 
 import os
+import re
 import shutil
 import json
 import yaml
@@ -18,6 +19,7 @@ from .packager import Packager
 from .validator import ThemeValidator
 from .screenshot_generator import ScreenshotGenerator
 from .icon_generator import IconGenerator
+from .utils import save_json_file
 from .constants import (
     DEFAULT_OUTPUT_DIR,
     DEFAULT_THEMES_DIR,
@@ -27,6 +29,10 @@ from .constants import (
 
 logger = logging.getLogger(__name__)
 
+# AI palette parsing: ("name", "#hex") tuples, then looser name: #hex labels
+_COLOR_TUPLE_RE = re.compile(r'\(\s*["\'](\w+)["\']\s*,\s*["\']#?([0-9A-Fa-f]{6})["\']')
+_COLOR_LABEL_RE = re.compile(r'(\w+)\s*[-:=]\s*#?([0-9A-Fa-f]{6})')
+
 class ThemeBuilder:
     """Main theme builder that orchestrates the build process"""
 
@@ -613,7 +619,8 @@ class ThemeBuilder:
             "editorGutter.deletedBackground": "#94151b",
         }
 
-    def _get_default_token_colors(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _get_default_token_colors() -> List[Dict[str, Any]]:
         """Get default token colors for syntax highlighting"""
         return [
             {
@@ -816,14 +823,11 @@ Make sure all colors fit the theme: {theme_description}"""
 
     def _parse_color_tuples(self, response: str) -> Dict[str, str]:
         """Parse color tuples from AI response"""
-        import re
-
         colors = {}
 
         # Try to find tuple patterns
         # Match patterns like ("name", "#hex") or ('name', '#hex')
-        pattern = r'\(\s*["\'](\w+)["\']\s*,\s*["\']#?([0-9A-Fa-f]{6})["\']'
-        matches = re.findall(pattern, response)
+        matches = _COLOR_TUPLE_RE.findall(response)
 
         for name, hex_value in matches:
             colors[name] = f"#{hex_value}"
@@ -831,8 +835,7 @@ Make sure all colors fit the theme: {theme_description}"""
         # If we didn't find enough colors, try simpler patterns
         if len(colors) < 10:
             # Try to find hex colors with labels
-            pattern2 = r'(\w+)\s*[-:=]\s*#?([0-9A-Fa-f]{6})'
-            matches2 = re.findall(pattern2, response)
+            matches2 = _COLOR_LABEL_RE.findall(response)
             for name, hex_value in matches2:
                 colors[name] = f"#{hex_value}"
 
@@ -1201,8 +1204,7 @@ Make sure all colors fit the theme: {theme_description}"""
                     package_data['icon'] = f"{assets_base_url}/{theme_name}_icon.png"
                     
                     # Write back the updated package.json
-                    with open(package_json_path, 'w') as f:
-                        json.dump(package_data, f, indent=2)
+                    save_json_file(package_data, package_json_path)
                     
                     logger.info(f"✓ Updated package.json icon URL: {package_data['icon']}")
                     
@@ -1249,8 +1251,7 @@ Make sure all colors fit the theme: {theme_description}"""
         
         # Save manifest
         manifest_path = theme_dir / 'build_manifest.json'
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        save_json_file(manifest, manifest_path)
         
         logger.info(f"✓ Created build manifest: {manifest_path}")
         
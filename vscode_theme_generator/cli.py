@@ -11,8 +11,6 @@ from pathlib import Path
 from termcolor import colored
 from tqdm import tqdm
 
-from wl_config_manager import ConfigManager
-from .builder import ThemeBuilder
 from .constants import VERSION
 from .utils import setup_logging, print_banner
 
@@ -355,6 +353,10 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    # Heavy imports deferred until a command actually runs (keeps --help/--version fast)
+    from wl_config_manager import ConfigManager
+    from .builder import ThemeBuilder
+
     try:
         # Load configuration
         config_path = args.config if hasattr(args, 'config') else Path('config.yaml')
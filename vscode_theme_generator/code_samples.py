@@ -0,0 +1,117 @@
+"""
+Sample source files opened in VS Code when taking theme screenshots
+"""
+
+CODE_SAMPLES = {
+    'python': '''#!/usr/bin/env python3
+"""VS Code Theme Preview - Python Sample"""
+
+import asyncio
+from typing import List, Dict, Optional
+from dataclasses import dataclass
+
+@dataclass
+class ThemeColors:
+    """Theme color configuration"""
+    background: str = "#1e1e1e"
+    foreground: str = "#d4d4d4"
+    accent: str = "#007acc"
+
+    def validate(self) -> bool:
+        """Validate color values"""
+        for color in [self.background, self.foreground, self.accent]:
+            if not color.startswith('#'):
+                return False
+        return True
+
+async def process_theme(name: str, colors: ThemeColors) -> Dict[str, str]:
+    """Process theme configuration"""
+    if not colors.validate():
+        raise ValueError(f"Invalid colors for theme: {name}")
+
+    # Simulate async processing
+    await asyncio.sleep(0.1)
+
+    return {
+        "name": name,
+        "type": "dark" if colors.background < "#7f7f7f" else "light",
+        "colors": {
+            "editor.background": colors.background,
+            "editor.foreground": colors.foreground,
+        }
+    }
+
+# Example usage
+if __name__ == "__main__":
+    theme = ThemeColors()
+    result = asyncio.run(process_theme("My Theme", theme))
+    print(f"Generated theme: {result}")
+''',
+    'javascript': '''// VS Code Theme Preview - JavaScript Sample
+
+import React, { useState, useEffect } from 'react';
+import { ThemeProvider } from './contexts/ThemeContext';
+
+const ThemePreview = ({ themeName, colors }) => {
+    const [loading, setLoading] = useState(true);
+    const [preview, setPreview] = useState(null);
+
+    useEffect(() => {
+        async function loadPreview() {
+            try {
+                const response = await fetch(`/api/themes/${themeName}`);
+                const data = await response.json();
+                setPreview(data);
+            } catch (error) {
+                console.error('Failed:', error);
+            } finally {
+                setLoading(false);
+            }
+        }
+
+        loadPreview();
+    }, [themeName]);
+
+    return (
+        <div className="theme-preview">
+            {loading ? <Loading /> : <Preview data={preview} />}
+        </div>
+    );
+};
+
+export default ThemePreview;
+''',
+    'rust': '''// VS Code Theme Preview - Rust Sample
+
+use std::collections::HashMap;
+use serde::{Deserialize, Serialize};
+
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct Theme {
+    name: String,
+    colors: HashMap<String, String>,
+}
+
+impl Theme {
+    pub fn new(name: impl Into<String>) -> Self {
+        Self {
+            name: name.into(),
+            colors: HashMap::new(),
+        }
+    }
+
+    pub fn with_color(mut self, key: &str, value: &str) -> Self {
+        self.colors.insert(key.to_string(), value.to_string());
+        self
+    }
+}
+
+fn main() {
+    let theme = Theme::new("rust-theme")
+        .with_color("editor.background", "#1e1e1e")
+        .with_color("editor.foreground", "#d4d4d4");
+
+    println!("Theme: {:?}", theme);
+}
+''',
+}
@@ -2,46 +2,64 @@
 Color utility functions for theme generation
 """
 
-import re
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from .constants import fast_is_hex_color
+from .color_utils_numba import _adjust_brightness_rgb, _rgb_saturate
+
+# Perceived brightness channel weights scaled to integers (see brightness_int)
+_BRIGHTNESS_WEIGHTS_INT = np.array([299, 587, 114], dtype=np.int32)
+
+# sRGB channel (0-255) to linear light, precomputed for every channel value
+_SRGB_LUT = tuple(
+    c / 255 / 12.92 if c / 255 <= 0.03928 else ((c / 255 + 0.055) / 1.055) ** 2.4
+    for c in range(256)
+)
+
+# Size of the per-function caches for pure color conversions. Cached functions
+# take hex color strings only; passing unhashable values raises TypeError.
+_COLOR_CACHE_SIZE = 2048
 
 def validate_hex_color(color: str) -> bool:
-    """Validate hex color format"""
-    pattern = r'^#[0-9A-Fa-f]{6}$|^#[0-9A-Fa-f]{8}$'
-    return bool(re.match(pattern, color))
+    """Validate hex color format (#RRGGBB or #RRGGBBAA)"""
+    return len(color) in (7, 9) and fast_is_hex_color(color)
 
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Convert hex color to RGB tuple"""
-    hex_color = hex_color.lstrip('#')
-    if len(hex_color) == 8:
-        hex_color = hex_color[:6]  # Remove alpha
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    # Alpha (if any) is dropped by only decoding the first six digits
+    rgb = bytes.fromhex(hex_color.lstrip('#')[:6])
+    if len(rgb) != 3:
+        raise ValueError(f"Invalid hex color: {hex_color}")
+    return rgb[0], rgb[1], rgb[2]
 
 def rgb_to_hex(r: int, g: int, b: int) -> str:
     """Convert RGB to hex color"""
-    return f"#{r:02x}{g:02x}{b:02x}"
+    return '#' + bytes((r, g, b)).hex()
 
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
 def get_brightness(hex_color: str) -> float:
     """Get perceived brightness of color (0-1)"""
     r, g, b = hex_to_rgb(hex_color)
     # Using perceived brightness formula
     return (0.299 * r + 0.587 * g + 0.114 * b) / 255
 
+def brightness_int(r: int, g: int, b: int) -> int:
+    """Get perceived brightness scaled to integers (0-255000)"""
+    return 299 * r + 587 * g + 114 * b
+
+def is_dark_rgb(r: int, g: int, b: int) -> bool:
+    """Check if perceived brightness is below 50% using integer math"""
+    return 299 * r + 587 * g + 114 * b < 127500
+
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
 def get_luminance(hex_color: str) -> float:
     """Get relative luminance for WCAG contrast calculations"""
     r, g, b = hex_to_rgb(hex_color)
-    
-    def adjust_channel(channel: int) -> float:
-        c = channel / 255
-        if c <= 0.03928:
-            return c / 12.92
-        return ((c + 0.055) / 1.055) ** 2.4
-    
-    r_adj = adjust_channel(r)
-    g_adj = adjust_channel(g)
-    b_adj = adjust_channel(b)
-    
-    return 0.2126 * r_adj + 0.7152 * g_adj + 0.0722 * b_adj
+    return 0.2126 * _SRGB_LUT[r] + 0.7152 * _SRGB_LUT[g] + 0.0722 * _SRGB_LUT[b]
 
 def calculate_contrast_ratio(bg_color: str, fg_color: str) -> float:
     """Calculate WCAG contrast ratio between two colors"""
@@ -56,16 +74,7 @@ def calculate_contrast_ratio(bg_color: str, fg_color: str) -> float:
 def adjust_brightness(hex_color: str, percent: int) -> str:
     """Adjust brightness by percentage (-100 to 100)"""
     r, g, b = hex_to_rgb(hex_color)
-    
-    # Calculate adjustment
-    factor = 1 + (percent / 100)
-    
-    # Apply adjustment
-    r = max(0, min(255, int(r * factor)))
-    g = max(0, min(255, int(g * factor)))
-    b = max(0, min(255, int(b * factor)))
-    
-    return rgb_to_hex(r, g, b)
+    return rgb_to_hex(*_adjust_brightness_rgb(r, g, b, percent))
 
 def get_complementary_color(hex_color: str) -> str:
     """Get complementary color"""
@@ -92,50 +101,68 @@ def blend_colors(color1: str, color2: str, ratio: float = 0.5) -> str:
 def saturate_color(hex_color: str, amount: float) -> str:
     """Increase color saturation"""
     r, g, b = hex_to_rgb(hex_color)
-    
-    # Convert to HSL
-    r_norm = r / 255
-    g_norm = g / 255
-    b_norm = b / 255
-    
-    max_val = max(r_norm, g_norm, b_norm)
-    min_val = min(r_norm, g_norm, b_norm)
+    return rgb_to_hex(*_rgb_saturate(r, g, b, float(amount)))
+
+
+def hex_to_rgb_array(colors: List[str]) -> np.ndarray:
+    """Convert a list of hex colors to an (N, 3) uint8 RGB array"""
+    hex_digits = ''.join(color.lstrip('#')[:6] for color in colors)
+    return np.frombuffer(bytes.fromhex(hex_digits), dtype=np.uint8).reshape(-1, 3)
+
+def rgb_array_to_hex(rgb: np.ndarray) -> List[str]:
+    """Convert an (N, 3) RGB array to a list of hex colors"""
+    hex_digits = np.ascontiguousarray(rgb, dtype=np.uint8).tobytes().hex()
+    return ['#' + hex_digits[i:i + 6] for i in range(0, len(hex_digits), 6)]
+
+def brightness_int_array(rgb: np.ndarray) -> np.ndarray:
+    """Get integer perceived brightness (0-255000) for an (N, 3) RGB array"""
+    return rgb.astype(np.int32) @ _BRIGHTNESS_WEIGHTS_INT
+
+def adjust_brightness_array(rgb: np.ndarray, percent) -> np.ndarray:
+    """Adjust brightness of an (N, 3) RGB array by percentage (scalar or per row)"""
+    factor = 1 + np.asarray(percent, dtype=np.float64) / 100
+    if factor.ndim:
+        factor = factor[:, None]
+    return np.clip((rgb * factor).astype(np.int32), 0, 255).astype(np.uint8)
+
+def _hue_to_rgb_array(p: np.ndarray, q: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Convert hue offsets to RGB channels (0-1), elementwise"""
+    t = np.where(t < 0, t + 1, t)
+    t = np.where(t > 1, t - 1, t)
+    return np.select(
+        [t < 1 / 6, t < 1 / 2, t < 2 / 3],
+        [p + (q - p) * 6 * t, q, p + (q - p) * (2 / 3 - t) * 6],
+        default=p,
+    )
+
+def saturate_array(rgb: np.ndarray, amount: float) -> np.ndarray:
+    """Increase saturation of an (N, 3) RGB array via HSL (same results as saturate_color)"""
+    norm = rgb / 255.0
+    r, g, b = norm[:, 0], norm[:, 1], norm[:, 2]
+    max_val = norm.max(axis=1)
+    min_val = norm.min(axis=1)
     l = (max_val + min_val) / 2
-    
-    if max_val == min_val:
-        h = s = 0
-    else:
-        d = max_val - min_val
-        s = d / (2 - max_val - min_val) if l > 0.5 else d / (max_val + min_val)
-        
-        if max_val == r_norm:
-            h = (g_norm - b_norm) / d + (6 if g_norm < b_norm else 0)
-        elif max_val == g_norm:
-            h = (b_norm - r_norm) / d + 2
-        else:
-            h = (r_norm - g_norm) / d + 4
-        h /= 6
-    
-    # Adjust saturation
-    s = min(1, s * (1 + amount))
-    
-    # Convert back to RGB
-    if s == 0:
-        r = g = b = int(l * 255)
-    else:
-        def hue_to_rgb(p: float, q: float, t: float) -> float:
-            if t < 0: t += 1
-            if t > 1: t -= 1
-            if t < 1/6: return p + (q - p) * 6 * t
-            if t < 1/2: return q
-            if t < 2/3: return p + (q - p) * (2/3 - t) * 6
-            return p
-        
-        q = l * (1 + s) if l < 0.5 else l + s - l * s
-        p = 2 * l - q
-        
-        r = int(hue_to_rgb(p, q, h + 1/3) * 255)
-        g = int(hue_to_rgb(p, q, h) * 255)
-        b = int(hue_to_rgb(p, q, h - 1/3) * 255)
-    
-    return rgb_to_hex(r, g, b)
\ No newline at end of file
+    d = max_val - min_val
+    chromatic = d != 0
+
+    # Grays divide by zero here; their hue and saturation are masked to 0 below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l > 0.5, d / (2 - max_val - min_val), d / (max_val + min_val))
+        h = np.select(
+            [max_val == r, max_val == g],
+            [(g - b) / d + np.where(g < b, 6, 0), (b - r) / d + 2],
+            default=(r - g) / d + 4,
+        ) / 6
+    s = np.where(chromatic, s, 0.0)
+    h = np.where(chromatic, h, 0.0)
+
+    s = np.minimum(1.0, s * (1 + amount))
+    q = np.where(l < 0.5, l * (1 + s), l + s - l * s)
+    p = 2 * l - q
+
+    out = np.stack([_hue_to_rgb_array(p, q, h + 1 / 3),
+                    _hue_to_rgb_array(p, q, h),
+                    _hue_to_rgb_array(p, q, h - 1 / 3)], axis=1)
+    out = np.where((s == 0)[:, None], (l * 255)[:, None], out * 255)
+    # Truncate like int() in the scalar kernel before narrowing to bytes
+    return out.astype(np.int32).astype(np.uint8)
@@ -0,0 +1,168 @@
+"""
+JIT-compiled color math kernels (falls back to pure Python without numba)
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _channel_to_linear(channel):
+    """Convert an sRGB channel (0-255) to linear light"""
+    c = channel / 255.0
+    if c <= 0.03928:
+        return c / 12.92
+    return ((c + 0.055) / 1.055) ** 2.4
+
+
+@njit(cache=True)
+def _luminance_rgb(r, g, b):
+    """Get relative luminance of an RGB color"""
+    return (0.2126 * _channel_to_linear(r)
+            + 0.7152 * _channel_to_linear(g)
+            + 0.0722 * _channel_to_linear(b))
+
+
+@njit(cache=True)
+def _clamp_channel(value):
+    """Clamp a channel value to 0-255"""
+    if value < 0:
+        return 0
+    if value > 255:
+        return 255
+    return value
+
+
+@njit(cache=True)
+def _adjust_brightness_rgb(r, g, b, percent):
+    """Adjust brightness of an RGB color by percentage (-100 to 100)"""
+    factor = 1 + percent / 100
+    return (_clamp_channel(int(r * factor)),
+            _clamp_channel(int(g * factor)),
+            _clamp_channel(int(b * factor)))
+
+
+@njit(cache=True)
+def _contrast_ratio(l1, l2):
+    """Calculate WCAG contrast ratio from two luminances"""
+    if l1 > l2:
+        return (l1 + 0.05) / (l2 + 0.05)
+    return (l2 + 0.05) / (l1 + 0.05)
+
+
+@njit(cache=True)
+def _meets_contrast(bg_lum, fg_r, fg_g, fg_b, pct, target):
+    """Check whether fg adjusted by pct percent meets target contrast against bg"""
+    r, g, b = _adjust_brightness_rgb(fg_r, fg_g, fg_b, pct)
+    return _contrast_ratio(bg_lum, _luminance_rgb(r, g, b)) >= target
+
+
+@njit(cache=True)
+def _min_contrast_step(bg_lum, fg_r, fg_g, fg_b, sign, target):
+    """Smallest brightness change (1-100%) in one direction that meets target, or 0"""
+    if _meets_contrast(bg_lum, fg_r, fg_g, fg_b, sign, target):
+        return 1
+    if not _meets_contrast(bg_lum, fg_r, fg_g, fg_b, sign * 100, target):
+        return 0
+
+    # Once fg has crossed bg's luminance, contrast only grows with the step,
+    # so the passing steps form a suffix that can be bisected
+    lo, hi = 1, 100
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if _meets_contrast(bg_lum, fg_r, fg_g, fg_b, sign * mid, target):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+@njit(cache=True)
+def _adjust_for_contrast_rgb(bg_r, bg_g, bg_b, fg_r, fg_g, fg_b, target):
+    """Find the smallest brightness adjustment of fg that meets target contrast against bg"""
+    bg_lum = _luminance_rgb(bg_r, bg_g, bg_b)
+
+    brighter = _min_contrast_step(bg_lum, fg_r, fg_g, fg_b, 1, target)
+    darker = _min_contrast_step(bg_lum, fg_r, fg_g, fg_b, -1, target)
+
+    # Prefer brightening when both directions need the same change
+    if brighter and (not darker or brighter <= darker):
+        return _adjust_brightness_rgb(fg_r, fg_g, fg_b, brighter)
+    if darker:
+        return _adjust_brightness_rgb(fg_r, fg_g, fg_b, -darker)
+
+    # If we can't fix it, return original
+    return fg_r, fg_g, fg_b
+
+
+@njit(cache=True)
+def _hue_to_rgb(p, q, t):
+    """Convert a hue offset to an RGB channel (0-1)"""
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1 / 6:
+        return p + (q - p) * 6 * t
+    if t < 1 / 2:
+        return q
+    if t < 2 / 3:
+        return p + (q - p) * (2 / 3 - t) * 6
+    return p
+
+
+@njit(cache=True)
+def _rgb_saturate(r, g, b, amount):
+    """Increase saturation of an RGB color via HSL"""
+    r_norm = r / 255.0
+    g_norm = g / 255.0
+    b_norm = b / 255.0
+
+    max_val = max(r_norm, g_norm, b_norm)
+    min_val = min(r_norm, g_norm, b_norm)
+    l = (max_val + min_val) / 2
+
+    h = 0.0
+    s = 0.0
+    if max_val != min_val:
+        d = max_val - min_val
+        s = d / (2 - max_val - min_val) if l > 0.5 else d / (max_val + min_val)
+
+        if max_val == r_norm:
+            h = (g_norm - b_norm) / d + (6 if g_norm < b_norm else 0)
+        elif max_val == g_norm:
+            h = (b_norm - r_norm) / d + 2
+        else:
+            h = (r_norm - g_norm) / d + 4
+        h /= 6
+
+    # Adjust saturation
+    s = min(1.0, s * (1 + amount))
+
+    if s == 0:
+        gray = int(l * 255)
+        return gray, gray, gray
+
+    q = l * (1 + s) if l < 0.5 else l + s - l * s
+    p = 2 * l - q
+
+    return (int(_hue_to_rgb(p, q, h + 1 / 3) * 255),
+            int(_hue_to_rgb(p, q, h) * 255),
+            int(_hue_to_rgb(p, q, h - 1 / 3) * 255))
+
+
+def warm_up():
+    """Compile (or load from cache) the kernels now rather than on first use"""
+    if not NUMBA_AVAILABLE:
+        return
+    _adjust_for_contrast_rgb(30, 30, 30, 60, 60, 60, 4.5)
+    _rgb_saturate(200, 100, 50, 0.5)
@@ -2,6 +2,9 @@
 Constants for VS Code Theme Generator
 """
 
+import json
+import re
+from collections.abc import Mapping
 from pathlib import Path
 
 # Version information
@@ -28,6 +31,22 @@ VSCODE_CATEGORIES = ["Themes"]
 # Color validation patterns
 HEX_COLOR_PATTERN = r"^#[0-9A-Fa-f]{6}$"
 HEX_COLOR_WITH_ALPHA_PATTERN = r"^#[0-9A-Fa-f]{8}$"
+HEX_COLOR_RE = re.compile(HEX_COLOR_PATTERN)
+HEX_COLOR_WITH_ALPHA_RE = re.compile(HEX_COLOR_WITH_ALPHA_PATTERN)
+
+_HEX_DIGITS = b"0123456789abcdefABCDEF"
+
+
+def fast_is_hex_color(value: str) -> bool:
+    """Check for #RRGGBB or #RRGGBBAA without going through the regex engine"""
+    if len(value) not in (7, 9) or value[0] != "#":
+        return False
+    try:
+        digits = value[1:].encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    # Deleting every hex digit leaves nothing behind only for valid colors
+    return not digits.translate(None, _HEX_DIGITS)
 
 # Default theme structure
 DEFAULT_THEME_STRUCTURE = {
@@ -46,8 +65,19 @@ DEFAULT_THEME_STRUCTURE = {
     }
 }
 
-# Required color keys for a valid theme
-REQUIRED_COLOR_KEYS = [
+# Serialized once; json.loads builds a fresh copy much faster than copy.deepcopy
+_DEFAULT_THEME_JSON = json.dumps(DEFAULT_THEME_STRUCTURE)
+
+
+def make_default_theme() -> dict:
+    """Return a fresh, mutable copy of DEFAULT_THEME_STRUCTURE.
+
+    Use this instead of copy.deepcopy(DEFAULT_THEME_STRUCTURE).
+    """
+    return json.loads(_DEFAULT_THEME_JSON)
+
+# Required color keys for a valid theme (ordered for reporting, set for lookups)
+REQUIRED_COLOR_KEYS_ORDER = (
     "editor.background",
     "editor.foreground",
     "activityBar.background",
@@ -56,7 +86,8 @@ REQUIRED_COLOR_KEYS = [
     "sideBar.foreground",
     "statusBar.background",
     "statusBar.foreground"
-]
+)
+REQUIRED_COLOR_KEYS = frozenset(REQUIRED_COLOR_KEYS_ORDER)
 
 # AI prompt templates
 AI_PROMPTS = {
@@ -109,143 +140,26 @@ Ensure the colors work well together and maintain good contrast.
 """
 }
 
-# Screenshot configuration
-SCREENSHOT_CONFIG = {
-    "window_size": (1920, 1080),
-    "code_samples": {
-        "python": """
-#!/usr/bin/env python3
-\"\"\"
-Example Python code for theme preview
-\"\"\"
-
-import asyncio
-from typing import List, Dict, Optional
-
-class ThemePreview:
-    def __init__(self, name: str, colors: Dict[str, str]):
-        self.name = name
-        self.colors = colors
-        self._initialized = False
-    
-    async def render(self, samples: List[str]) -> None:
-        \"\"\"Render theme preview with code samples\"\"\"
-        for idx, sample in enumerate(samples):
-            print(f"Rendering sample {idx + 1}...")
-            await self._process_sample(sample)
-    
-    async def _process_sample(self, sample: str) -> Optional[str]:
-        # Process each code sample
-        try:
-            result = await asyncio.sleep(0.1)
-            return f"Processed: {sample}"
-        except Exception as e:
-            print(f"Error: {e}")
-            return None
-
-# Example usage
-if __name__ == "__main__":
-    theme = ThemePreview("My Theme", {"bg": "#000000"})
-    asyncio.run(theme.render(["sample1", "sample2"]))
-""",
-        
-        "javascript": """
-// Example JavaScript code for theme preview
 
-import React, { useState, useEffect } from 'react';
-import { ThemeProvider } from './theme-context';
+class _LazyCodeSamples(Mapping):
+    """Read-only view of code_samples.CODE_SAMPLES, imported on first access"""
 
-const ThemePreview = ({ themeName, colors }) => {
-    const [loading, setLoading] = useState(true);
-    const [preview, setPreview] = useState(null);
-    
-    useEffect(() => {
-        // Load theme preview
-        async function loadPreview() {
-            try {
-                const response = await fetch(`/api/themes/${themeName}`);
-                const data = await response.json();
-                setPreview(data);
-            } catch (error) {
-                console.error('Failed to load preview:', error);
-            } finally {
-                setLoading(false);
-            }
-        }
-        
-        loadPreview();
-    }, [themeName]);
-    
-    return (
-        <ThemeProvider value={{ colors }}>
-            <div className="theme-preview">
-                {loading ? (
-                    <LoadingSpinner />
-                ) : (
-                    <PreviewPane data={preview} />
-                )}
-            </div>
-        </ThemeProvider>
-    );
-};
-
-export default ThemePreview;
-""",
-        
-        "rust": """
-// Example Rust code for theme preview
-
-use std::collections::HashMap;
-use serde::{Deserialize, Serialize};
-
-#[derive(Debug, Clone, Serialize, Deserialize)]
-pub struct Theme {
-    name: String,
-    display_name: String,
-    colors: HashMap<String, String>,
-    token_colors: Vec<TokenColor>,
-}
+    def _samples(self):
+        from .code_samples import CODE_SAMPLES
+        return CODE_SAMPLES
 
-#[derive(Debug, Clone, Serialize, Deserialize)]
-pub struct TokenColor {
-    name: String,
-    scope: Vec<String>,
-    settings: TokenSettings,
-}
+    def __getitem__(self, key):
+        return self._samples()[key]
 
-impl Theme {
-    pub fn new(name: impl Into<String>) -> Self {
-        Self {
-            name: name.into(),
-            display_name: String::new(),
-            colors: HashMap::new(),
-            token_colors: Vec::new(),
-        }
-    }
-    
-    pub fn with_color(mut self, key: &str, value: &str) -> Self {
-        self.colors.insert(key.to_string(), value.to_string());
-        self
-    }
-    
-    pub fn build(self) -> Result<Theme, ThemeError> {
-        if self.colors.is_empty() {
-            return Err(ThemeError::NoColors);
-        }
-        Ok(self)
-    }
-}
+    def __iter__(self):
+        return iter(self._samples())
+
+    def __len__(self):
+        return len(self._samples())
 
-fn main() {
-    let theme = Theme::new("rust-theme")
-        .with_color("editor.background", "#1e1e1e")
-        .with_color("editor.foreground", "#d4d4d4")
-        .build()
-        .expect("Failed to build theme");
-    
-    println!("Created theme: {:?}", theme);
-}
-"""
-    }
-}
 
+# Screenshot configuration
+SCREENSHOT_CONFIG = {
+    "window_size": (1920, 1080),
+    "code_samples": _LazyCodeSamples(),
+}
@@ -4,14 +4,58 @@ Icon generator for VS Code themes
 
 import logging
 import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from PIL import Image
 import shutil
 
 logger = logging.getLogger(__name__)
 
+# Procedural icon "code" lines: fixed positions and varied lengths for a code-like look
+_LINE_HEIGHT = 8
+_LINE_MARGIN = 30
+_LINE_Y_START = 35
+_CODE_LINE_BOXES = tuple(
+    (_LINE_MARGIN, _LINE_Y_START + i * (_LINE_HEIGHT + 4),
+     _LINE_MARGIN + length, _LINE_Y_START + i * (_LINE_HEIGHT + 4) + _LINE_HEIGHT)
+    for i, length in enumerate((40, 60, 50, 70, 45, 55))
+)
+_CURSOR_X = _LINE_MARGIN + 25
+_CURSOR_Y = _LINE_Y_START + 2 * (_LINE_HEIGHT + 4)
+_CURSOR_BOX = (_CURSOR_X, _CURSOR_Y, _CURSOR_X + 2, _CURSOR_Y + _LINE_HEIGHT + 2)
+
+# The shared FreeType face is not safe to render from several threads at once
+_FONT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _rgb(color: str) -> tuple:
+    """Parse a theme color once into the tuple PIL would derive from it"""
+    if len(color) in (7, 9) and color[0] == '#':
+        try:
+            return tuple(bytes.fromhex(color[1:]))
+        except ValueError:
+            pass
+    # Short hex, color names, etc. keep PIL's own parsing (and its errors)
+    from PIL import ImageColor
+    return ImageColor.getrgb(color)
+
+
+@lru_cache(maxsize=1)
+def _load_icon_font():
+    """Load the font for the theme initial once per process"""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold", 24)
+    except OSError:
+        return ImageFont.load_default()
+
 
 class IconGenerator:
     """Generates icons for VS Code themes using AI"""
@@ -20,6 +64,17 @@ class IconGenerator:
         self.config = config
         self.icon_size = (128, 128)  # VS Code marketplace icon size
 
+        # Static procedural icon geometry, derived from icon_size once
+        margin = 10
+        self._circle_bbox = [margin, margin, self.icon_size[0] - margin, self.icon_size[1] - margin]
+        self._initial_pos = (self.icon_size[0] - 35, self.icon_size[1] - 35)
+
+        # Icons are tiny; max zlib effort buys almost nothing in size
+        self._png_options = {
+            'compress_level': config.get('build.png_compress_level', 1),
+            'optimize': False,
+        }
+
         # Check if AI is enabled
         self.ai_enabled = config.get('ai.enabled', True)
         if self.ai_enabled:
@@ -28,6 +83,8 @@ class IconGenerator:
                 ai_manager_config = config.get('ai_manager', {})
                 if ai_manager_config:
                     self.ai_manager = AIManager(ai_manager_config)
+                    # The AI manager loads the icon prompt from here; create it once, not per request
+                    Path(config.get('ai_manager.prompt_folder', './prompts')).mkdir(exist_ok=True)
                 else:
                     logger.warning("No ai_manager configuration found")
                     self.ai_manager = None
@@ -72,10 +129,6 @@ class IconGenerator:
         # Get theme description
         description = theme_data.get('description', theme_name)
 
-        # Create prompt file if needed
-        prompts_dir = Path(self.config.get('ai_manager.prompt_folder', './prompts'))
-        prompts_dir.mkdir(exist_ok=True)
-
         # Prepare prompt data
         prompt_data = {
             'theme_description': description
@@ -127,7 +180,7 @@ class IconGenerator:
                 resized = img.resize(self.icon_size, Image.Resampling.LANCZOS)
 
                 # Save the resized icon
-                resized.save(output_path, 'PNG')
+                resized.save(output_path, 'PNG', **self._png_options)
 
                 logger.info(f"Resized icon from {img.size} to {self.icon_size}")
         except Exception as e:
@@ -137,16 +190,16 @@ class IconGenerator:
 
     def _generate_procedural_icon(self, theme_name: str, theme_data: Dict[str, Any], output_path: Path):
         """Generate a procedural icon based on theme colors"""
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
 
         # Get theme colors
         colors = theme_data.get('colors', {})
 
         # Extract key colors
-        bg_color = colors.get('editor.background', '#1e1e1e')
-        fg_color = colors.get('editor.foreground', '#d4d4d4')
-        accent_color = colors.get('activityBar.background', '#333333')
-        badge_color = colors.get('activityBarBadge.background', '#007acc')
+        bg_color = _rgb(colors.get('editor.background', '#1e1e1e'))
+        fg_color = _rgb(colors.get('editor.foreground', '#d4d4d4'))
+        accent_color = _rgb(colors.get('activityBar.background', '#333333'))
+        badge_color = _rgb(colors.get('activityBarBadge.background', '#007acc'))
 
         # Create image with transparent background
         img = Image.new('RGBA', self.icon_size, (0, 0, 0, 0))
@@ -154,16 +207,9 @@ class IconGenerator:
 
         # Draw a simple geometric design based on theme
         # Background circle
-        margin = 10
-        draw.ellipse([margin, margin, self.icon_size[0] - margin, self.icon_size[1] - margin],
-                    fill=bg_color)
+        draw.ellipse(self._circle_bbox, fill=bg_color)
 
         # Inner design - create a code-editor inspired icon
-        # Draw "code" lines
-        line_height = 8
-        line_margin = 30
-        y_start = 35
-
         # Simulate code with colored rectangles
         code_colors = [
             badge_color,  # keyword
@@ -172,36 +218,19 @@ class IconGenerator:
             fg_color,     # text
         ]
 
-        for i in range(6):
-            y = y_start + i * (line_height + 4)
-
-            # Vary line lengths for code-like appearance
-            line_lengths = [40, 60, 50, 70, 45, 55]
-            line_length = line_lengths[i % len(line_lengths)]
-
-            # Draw the "code" line
-            color = code_colors[i % len(code_colors)]
-            draw.rectangle([line_margin, y, line_margin + line_length, y + line_height],
-                          fill=color)
+        for i, box in enumerate(_CODE_LINE_BOXES):
+            draw.rectangle(box, fill=code_colors[i % len(code_colors)])
 
         # Add a small accent - like a cursor
-        cursor_x = line_margin + 25
-        cursor_y = y_start + 2 * (line_height + 4)
-        draw.rectangle([cursor_x, cursor_y, cursor_x + 2, cursor_y + line_height + 2],
-                      fill=badge_color)
+        draw.rectangle(_CURSOR_BOX, fill=badge_color)
 
         # Add theme initial in corner
-        try:
-            font = ImageFont.truetype("DejaVuSans-Bold", 24)
-        except:
-            font = ImageFont.load_default()
-
         initial = theme_name[0].upper()
-        draw.text((self.icon_size[0] - 35, self.icon_size[1] - 35), initial,
-                 fill=fg_color, font=font)
+        with _FONT_LOCK:
+            draw.text(self._initial_pos, initial, fill=fg_color, font=_load_icon_font())
 
         # Save the icon
-        img.save(output_path, 'PNG')
+        img.save(output_path, 'PNG', **self._png_options)
 
     def generate_icon_batch(self, themes: list, output_base_dir: Path, delay_between_icons: int = 2) -> Dict[str, Any]:
         """Generate icons for multiple themes with rate limiting"""
@@ -213,22 +242,30 @@ class IconGenerator:
             'generated_icons': []
         }
 
+        if not self.ai_manager and len(themes) > 1:
+            # Procedural icons need no rate limiting; overlap drawing and PNG encoding
+            workers = min(len(themes), os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self.generate_icon, theme_name, theme_data, output_base_dir / theme_name)
+                    for theme_name, theme_data in themes
+                ]
+                for (theme_name, _), future in zip(themes, futures):
+                    try:
+                        self._record_icon_result(results, theme_name, future.result())
+                    except Exception as e:
+                        logger.error(f"Failed to generate icon for {theme_name}: {e}")
+                        results['failed'] += 1
+                        results['failed_themes'].append(theme_name)
+            return results
+
         for idx, (theme_name, theme_data) in enumerate(themes):
             logger.info(f"\nGenerating icon {idx + 1}/{len(themes)}: {theme_name}")
 
             try:
                 theme_output_dir = output_base_dir / theme_name
                 icon_path = self.generate_icon(theme_name, theme_data, theme_output_dir)
-
-                if icon_path and icon_path.exists():
-                    results['generated'] += 1
-                    results['generated_icons'].append({
-                        'theme': theme_name,
-                        'path': str(icon_path)
-                    })
-                else:
-                    results['failed'] += 1
-                    results['failed_themes'].append(theme_name)
+                self._record_icon_result(results, theme_name, icon_path)
 
                 # Delay between AI requests to avoid rate limiting
                 if self.ai_manager and idx < len(themes) - 1:
@@ -240,4 +277,16 @@ class IconGenerator:
                 results['failed'] += 1
                 results['failed_themes'].append(theme_name)
 
-        return results
\ No newline at end of file
+        return results
+
+    def _record_icon_result(self, results: Dict[str, Any], theme_name: str, icon_path: Optional[Path]):
+        """Add one generate_icon outcome to batch results"""
+        if icon_path and icon_path.exists():
+            results['generated'] += 1
+            results['generated_icons'].append({
+                'theme': theme_name,
+                'path': str(icon_path)
+            })
+        else:
+            results['failed'] += 1
+            results['failed_themes'].append(theme_name)
@@ -3,20 +3,105 @@ VSIX packager for VS Code themes
 """
 
 import os
-import json
 import shutil
 import subprocess
 import logging
+import time
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+from .utils import load_json_file
 
 logger = logging.getLogger(__name__)
 
+# vsce/npm don't rely on inherited descriptors; skipping the close-all scan lets
+# subprocess use the faster vfork/posix_spawn path on POSIX
+_CLOSE_FDS = os.name != 'posix'
+
+# Entries a theme directory needs before it can be packaged
+_REQUIRED_FILES = ('package.json', 'README.md')
+_REQUIRED_DIRS = ('themes',)
+
+# Installable package templates, formatted with theme_name
+_WINDOWS_INSTALL_TMPL = """@echo off
+echo Installing {theme_name} VS Code Theme...
+code --install-extension {theme_name}.vsix
+if %errorlevel% neq 0 (
+    echo Failed to install theme. Make sure VS Code is installed and in PATH.
+    pause
+    exit /b 1
+)
+echo Theme installed successfully!
+echo Restart VS Code and select the theme from Preferences > Color Theme
+pause
+"""
+
+_UNIX_INSTALL_TMPL = """#!/bin/bash
+echo "Installing {theme_name} VS Code Theme..."
+code --install-extension {theme_name}.vsix
+if [ $? -ne 0 ]; then
+    echo "Failed to install theme. Make sure VS Code is installed and in PATH."
+    exit 1
+fi
+echo "Theme installed successfully!"
+echo "Restart VS Code and select the theme from Preferences > Color Theme"
+"""
+
+_PACKAGE_README_TMPL = """# {theme_name} VS Code Theme Package
+
+## Installation
+
+### Option 1: Automatic Installation
+
+**Windows:**
+1. Double-click `install.bat`
+
+**macOS/Linux:**
+1. Open Terminal in this directory
+2. Run: `./install.sh`
+
+### Option 2: Manual Installation
+
+1. Open VS Code
+2. Press `Ctrl+Shift+P` (or `Cmd+Shift+P` on macOS)
+3. Type "Install from VSIX"
+4. Select the `{theme_name}.vsix` file from this directory
+
+### Option 3: Command Line
+
+```bash
+code --install-extension {theme_name}.vsix
+```
+
+## Activating the Theme
+
+1. Open VS Code
+2. Press `Ctrl+K Ctrl+T` (or `Cmd+K Cmd+T` on macOS)
+3. Select "{theme_name}" from the list
+
+## Troubleshooting
+
+If installation fails:
+- Make sure VS Code is installed
+- Ensure VS Code is in your system PATH
+- Try running VS Code as administrator (Windows)
+
+## Uninstalling
+
+To uninstall the theme:
+1. Open VS Code
+2. Go to Extensions (Ctrl+Shift+X)
+3. Search for "{theme_name}"
+4. Click Uninstall
+"""
+
 class Packager:
     """Handles VSIX packaging for VS Code extensions"""
     
     def __init__(self, config):
         self.config = config
+        self._vsce_path: Optional[str] = None  # Resolved vsce executable, cached
         
     def create_vsix(self, theme_dir: Path, output_path: Optional[Path] = None) -> Path:
         """Create VSIX package from theme directory"""
@@ -24,13 +109,14 @@ class Packager:
         if not self._check_vsce_installed():
             logger.warning("vsce not found. Installing...")
             self._install_vsce()
+            self._check_vsce_installed()
 
         # Validate theme directory
         if not self._validate_theme_directory(theme_dir):
             raise ValueError(f"Invalid theme directory: {theme_dir}")
 
         # Read package.json to get name and version
-        package_json = json.loads((theme_dir / 'package.json').read_text())
+        package_json = load_json_file(theme_dir / 'package.json')
         name = package_json.get('name', 'theme')
         version = package_json.get('version', '1.0.0')
         
@@ -66,10 +152,12 @@ class Packager:
             # Run vsce package command WITHOUT --out flag first to see default behavior
             # Or use just the filename without path
             result = subprocess.run(
-                ['vsce', 'package', '--out', vsix_filename],
+                [self._vsce_path or 'vsce', 'package', '--out', vsix_filename],
                 cwd=theme_dir,
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=_CLOSE_FDS
             )
 
             if result.returncode != 0:
@@ -97,15 +185,10 @@ class Packager:
                 
     def _check_vsce_installed(self) -> bool:
         """Check if vsce is installed"""
-        try:
-            result = subprocess.run(
-                ['vsce', '--version'],
-                capture_output=True,
-                text=True
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        # A PATH lookup is enough; no need to start Node for 'vsce --version'
+        if self._vsce_path is None:
+            self._vsce_path = shutil.which('vsce')
+        return self._vsce_path is not None
             
     def _install_vsce(self):
         """Install vsce using npm"""
@@ -113,8 +196,10 @@ class Packager:
             logger.info("Installing vsce...")
             result = subprocess.run(
                 ['npm', 'install', '-g', '@vscode/vsce'],
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=_CLOSE_FDS
             )
             
             if result.returncode != 0:
@@ -127,22 +212,28 @@ class Packager:
             
     def _validate_theme_directory(self, theme_dir: Path) -> bool:
         """Validate that directory has required files for VS Code extension"""
-        required_files = ['package.json', 'README.md']
-        required_dirs = ['themes']
-        
-        for file_name in required_files:
-            if not (theme_dir / file_name).exists():
+        # One directory listing instead of a stat per required entry
+        try:
+            with os.scandir(theme_dir) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError as e:
+            logger.error(f"Cannot read theme directory {theme_dir}: {e}")
+            return False
+
+        for file_name in _REQUIRED_FILES:
+            if file_name not in entries:
                 logger.error(f"Missing required file: {file_name}")
                 return False
-                
-        for dir_name in required_dirs:
-            if not (theme_dir / dir_name).is_dir():
+
+        for dir_name in _REQUIRED_DIRS:
+            entry = entries.get(dir_name)
+            if entry is None or not entry.is_dir():
                 logger.error(f"Missing required directory: {dir_name}")
                 return False
                 
         # Validate package.json
         try:
-            package_json = json.loads((theme_dir / 'package.json').read_text())
+            package_json = load_json_file(theme_dir / 'package.json')
             
             # Check required fields
             required_fields = ['name', 'version', 'engines', 'contributes']
@@ -166,117 +257,49 @@ class Packager:
     def create_installable_package(self, theme_dir: Path, output_dir: Path) -> Path:
         """Create a distributable package with installer script"""
         theme_name = theme_dir.name
-        package_dir = output_dir / f"{theme_name}-package"
-        package_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Copy theme files
-        theme_dest = package_dir / theme_name
-        if theme_dest.exists():
-            shutil.rmtree(theme_dest)
-        shutil.copytree(theme_dir, theme_dest)
-        
-        # Create VSIX
-        vsix_path = self.create_vsix(theme_dir, package_dir / f"{theme_name}.vsix")
-        
-        # Create install script for different platforms
-        self._create_install_scripts(package_dir, theme_name)
-        
-        # Create README for package
-        self._create_package_readme(package_dir, theme_name)
-        
-        # Create zip archive
-        archive_path = output_dir / f"{theme_name}-package.zip"
-        shutil.make_archive(
-            str(archive_path.with_suffix('')),
-            'zip',
-            package_dir
-        )
-        
-        # Clean up temp directory
-        shutil.rmtree(package_dir)
-        
-        logger.info(f"Created installable package: {archive_path}")
-        return archive_path
-    
-    def _create_install_scripts(self, package_dir: Path, theme_name: str):
-        """Create platform-specific install scripts"""
-        # Windows batch script
-        windows_script = f"""@echo off
-echo Installing {theme_name} VS Code Theme...
-code --install-extension {theme_name}.vsix
-if %errorlevel% neq 0 (
-    echo Failed to install theme. Make sure VS Code is installed and in PATH.
-    pause
-    exit /b 1
-)
-echo Theme installed successfully!
-echo Restart VS Code and select the theme from Preferences > Color Theme
-pause
-"""
-        (package_dir / 'install.bat').write_text(windows_script)
-        
-        # Unix shell script
-        unix_script = f"""#!/bin/bash
-echo "Installing {theme_name} VS Code Theme..."
-code --install-extension {theme_name}.vsix
-if [ $? -ne 0 ]; then
-    echo "Failed to install theme. Make sure VS Code is installed and in PATH."
-    exit 1
-fi
-echo "Theme installed successfully!"
-echo "Restart VS Code and select the theme from Preferences > Color Theme"
-"""
-        install_sh = package_dir / 'install.sh'
-        install_sh.write_text(unix_script)
-        install_sh.chmod(0o755)
-        
-    def _create_package_readme(self, package_dir: Path, theme_name: str):
-        """Create README for the package"""
-        readme_content = f"""# {theme_name} VS Code Theme Package
-
-## Installation
+        output_dir.mkdir(parents=True, exist_ok=True)
 
-### Option 1: Automatic Installation
-
-**Windows:**
-1. Double-click `install.bat`
-
-**macOS/Linux:**
-1. Open Terminal in this directory
-2. Run: `./install.sh`
-
-### Option 2: Manual Installation
-
-1. Open VS Code
-2. Press `Ctrl+Shift+P` (or `Cmd+Shift+P` on macOS)
-3. Type "Install from VSIX"
-4. Select the `{theme_name}.vsix` file from this directory
+        # Create VSIX
+        vsix_path = self.create_vsix(theme_dir, output_dir / f"{theme_name}.vsix")
 
-### Option 3: Command Line
+        # Write everything straight into the zip archive, no staging directory
+        archive_path = output_dir / f"{theme_name}-package.zip"
+        with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            # Theme files
+            self._write_tree_to_zip(zf, theme_dir, theme_name, exclude={vsix_path.resolve()})
 
-```bash
-code --install-extension {theme_name}.vsix
-```
+            # Packaged VSIX, named as the install scripts expect
+            zf.write(vsix_path, arcname=f"{theme_name}.vsix")
 
-## Activating the Theme
+            # Install scripts for different platforms
+            windows_script, unix_script = self._create_install_scripts(theme_name)
+            zf.writestr('install.bat', windows_script)
+            install_sh = zipfile.ZipInfo('install.sh', date_time=time.localtime()[:6])
+            install_sh.compress_type = zipfile.ZIP_DEFLATED
+            install_sh.external_attr = 0o100755 << 16
+            zf.writestr(install_sh, unix_script)
 
-1. Open VS Code
-2. Press `Ctrl+K Ctrl+T` (or `Cmd+K Cmd+T` on macOS)
-3. Select "{theme_name}" from the list
+            # README for package
+            zf.writestr('README.md', self._create_package_readme(theme_name))
 
-## Troubleshooting
+        logger.info(f"Created installable package: {archive_path}")
+        return archive_path
 
-If installation fails:
-- Make sure VS Code is installed
-- Ensure VS Code is in your system PATH
-- Try running VS Code as administrator (Windows)
+    def _write_tree_to_zip(self, zf: zipfile.ZipFile, src_dir: Path, arc_prefix: str, exclude: set):
+        """Recursively add a directory's files to a zip archive"""
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                arcname = f"{arc_prefix}/{entry.name}"
+                if entry.is_dir():
+                    self._write_tree_to_zip(zf, Path(entry.path), arcname, exclude)
+                elif Path(entry.path).resolve() not in exclude:
+                    zf.write(entry.path, arcname=arcname)
 
-## Uninstalling
+    def _create_install_scripts(self, theme_name: str) -> Tuple[str, str]:
+        """Create platform-specific install scripts (Windows, Unix)"""
+        return (_WINDOWS_INSTALL_TMPL.format(theme_name=theme_name),
+                _UNIX_INSTALL_TMPL.format(theme_name=theme_name))
 
-To uninstall the theme:
-1. Open VS Code
-2. Go to Extensions (Ctrl+Shift+X)
-3. Search for "{theme_name}"
-4. Click Uninstall
-"""
-        (package_dir / 'README.md').write_text(readme_content)
\ No newline at end of file
+    def _create_package_readme(self, theme_name: str) -> str:
+        """Create README for the package"""
+        return _PACKAGE_README_TMPL.format(theme_name=theme_name)
@@ -2,14 +2,6 @@
 Screenshot generator for VS Code themes
 """
 
-import subprocess
-import time
-import platform
-import shutil
-import json
-from pathlib import Path
-from typing import Optional, List
-
 import os
 import subprocess
 import platform
@@ -17,20 +9,26 @@ import shutil
 import time
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Tuple
-from PIL import Image, ImageDraw, ImageFont
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
 from .constants import SCREENSHOT_CONFIG
+from .utils import load_json_file
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1)
+def _vscode_available() -> bool:
+    """Probe for the VS Code CLI once per process"""
+    try:
+        result = subprocess.run(['code', '--version'], capture_output=True)
+        return result.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
 # In screenshot_generator.py, modify the class:
 
 class ScreenshotGenerator:
@@ -48,11 +46,7 @@ class ScreenshotGenerator:
 
     def _check_vscode_available(self) -> bool:
         """Check if VS Code is installed and available"""
-        try:
-            result = subprocess.run(['code', '--version'], capture_output=True)
-            return result.returncode == 0
-        except:
-            return False
+        return _vscode_available()
 
     def generate_single_screenshot(self,
                                  theme_name: str,
@@ -90,15 +84,13 @@ class VSCodeAutomationScreenshotGenerator:
         self.config = config
         self.system = platform.system()
         self.vscode_process = None  # Track the VS Code process we spawn
+        # zlib level for captured PNGs; flat editor chrome compresses fine at 1
+        self.png_compress_level = config.get('build.screenshot_config.png_compress_level', 1)
 
 
     def _check_vscode_installed(self) -> bool:
         """Check if VS Code is available"""
-        try:
-            result = subprocess.run(['code', '--version'], capture_output=True)
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        return _vscode_available()
 
     def _get_installed_extensions(self) -> List[str]:
         """Get list of installed VS Code extensions"""
@@ -121,122 +113,9 @@ class VSCodeAutomationScreenshotGenerator:
 
         # Get sample code from SCREENSHOT_CONFIG or use defaults
         samples = self.config.get('build.screenshot_config.code_samples', {})
+        from .code_samples import CODE_SAMPLES
 
-        default_samples = {
-            'python': '''#!/usr/bin/env python3
-"""VS Code Theme Preview - Python Sample"""
-
-import asyncio
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-
-@dataclass
-class ThemeColors:
-    """Theme color configuration"""
-    background: str = "#1e1e1e"
-    foreground: str = "#d4d4d4"
-    accent: str = "#007acc"
-
-    def validate(self) -> bool:
-        """Validate color values"""
-        for color in [self.background, self.foreground, self.accent]:
-            if not color.startswith('#'):
-                return False
-        return True
-
-async def process_theme(name: str, colors: ThemeColors) -> Dict[str, str]:
-    """Process theme configuration"""
-    if not colors.validate():
-        raise ValueError(f"Invalid colors for theme: {name}")
-
-    # Simulate async processing
-    await asyncio.sleep(0.1)
-
-    return {
-        "name": name,
-        "type": "dark" if colors.background < "#7f7f7f" else "light",
-        "colors": {
-            "editor.background": colors.background,
-            "editor.foreground": colors.foreground,
-        }
-    }
-
-# Example usage
-if __name__ == "__main__":
-    theme = ThemeColors()
-    result = asyncio.run(process_theme("My Theme", theme))
-    print(f"Generated theme: {result}")
-''',
-            'javascript': '''// VS Code Theme Preview - JavaScript Sample
-
-import React, { useState, useEffect } from 'react';
-import { ThemeProvider } from './contexts/ThemeContext';
-
-const ThemePreview = ({ themeName, colors }) => {
-    const [loading, setLoading] = useState(true);
-    const [preview, setPreview] = useState(null);
-
-    useEffect(() => {
-        async function loadPreview() {
-            try {
-                const response = await fetch(`/api/themes/${themeName}`);
-                const data = await response.json();
-                setPreview(data);
-            } catch (error) {
-                console.error('Failed:', error);
-            } finally {
-                setLoading(false);
-            }
-        }
-
-        loadPreview();
-    }, [themeName]);
-
-    return (
-        <div className="theme-preview">
-            {loading ? <Loading /> : <Preview data={preview} />}
-        </div>
-    );
-};
-
-export default ThemePreview;
-''',
-            'rust': '''// VS Code Theme Preview - Rust Sample
-
-use std::collections::HashMap;
-use serde::{Deserialize, Serialize};
-
-#[derive(Debug, Clone, Serialize, Deserialize)]
-pub struct Theme {
-    name: String,
-    colors: HashMap<String, String>,
-}
-
-impl Theme {
-    pub fn new(name: impl Into<String>) -> Self {
-        Self {
-            name: name.into(),
-            colors: HashMap::new(),
-        }
-    }
-
-    pub fn with_color(mut self, key: &str, value: &str) -> Self {
-        self.colors.insert(key.to_string(), value.to_string());
-        self
-    }
-}
-
-fn main() {
-    let theme = Theme::new("rust-theme")
-        .with_color("editor.background", "#1e1e1e")
-        .with_color("editor.foreground", "#d4d4d4");
-
-    println!("Theme: {:?}", theme);
-}
-'''
-        }
-
-        code = samples.get(language, default_samples.get(language, default_samples['python']))
+        code = samples.get(language, CODE_SAMPLES.get(language, CODE_SAMPLES['python']))
         file_ext = {'python': 'py', 'javascript': 'js', 'rust': 'rs'}.get(language, 'txt')
 
         code_file = temp_dir / f"sample.{file_ext}"
@@ -421,9 +300,11 @@ def test_example():
                 if shutil.which('import'):
                     # Use ImageMagick import with specific window ID
                     print("Taking screenshot with ImageMagick...")
+                    # PNG -quality is zlib level * 10 + filter (5 = adaptive)
                     result = subprocess.run([
                         'import',
                         '-window', window_id,
+                        '-quality', str(self.png_compress_level * 10 + 5),
                         str(output_path)
                     ])
                     return result.returncode == 0
@@ -564,12 +445,10 @@ def test_example():
 
         theme_label = theme_name
         if package_json_path.exists():
-            import json
-            with open(package_json_path) as f:
-                package_data = json.load(f)
-                themes = package_data.get('contributes', {}).get('themes', [])
-                if themes:
-                    theme_label = themes[0].get('label', theme_name)
+            package_data = load_json_file(package_json_path)
+            themes = package_data.get('contributes', {}).get('themes', [])
+            if themes:
+                theme_label = themes[0].get('label', theme_name)
 
         print(f"Using theme label: '{theme_label}'")
 
@@ -4,14 +4,126 @@ Template engine for generating VS Code theme files
 
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Dict, Any, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from .constants import DEFAULT_TEMPLATES_DIR, VSCODE_ENGINES_VERSION
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Files rendered for every theme: template -> (output path, context builder method)
+_RENDER_SPECS = {
+    'package.json.j2': ('package.json', '_package_context'),
+    'theme.json.j2': ('themes/{name}-color-theme.json', '_theme_context'),
+    'README.md.j2': ('README.md', '_readme_context'),
+    'CHANGELOG.md.j2': ('CHANGELOG.md', '_changelog_context'),
+    'LICENSE.j2': ('LICENSE', '_license_context'),
+    'quickstart.md.j2': ('vsc-extension-quickstart.md', '_quickstart_context'),
+}
+
+# Theme name -> marketplace package name
+_DASH_TABLE = str.maketrans({'_': '-'})
+
+# Template output pieces joined per encode/write when streaming to disk
+_STREAM_BUFFER_CHUNKS = 64
+
+# File buffer for rendered output; a whole theme JSON fits, so it reaches the OS in one write
+_WRITE_BUFFER_SIZE = 1 << 16
+
+# Threads used to render and write a theme's files concurrently
+_WRITE_WORKERS = 4
+
+# .vscode/launch.json is the same for every theme; baked as bytes, no encoding at run time
+_LAUNCH_JSON = (
+    b'{\n'
+    b'  "version": "0.2.0",\n'
+    b'  "configurations": [\n'
+    b'    {\n'
+    b'      "name": "Extension",\n'
+    b'      "type": "extensionHost",\n'
+    b'      "request": "launch",\n'
+    b'      "args": [\n'
+    b'        "--extensionDevelopmentPath=${workspaceFolder}"\n'
+    b'      ]\n'
+    b'    }\n'
+    b'  ]\n'
+    b'}'
+)
+_LAUNCH_JSON_MINIFIED = b'{"version":"0.2.0","configurations":[{"name":"Extension","type":"extensionHost","request":"launch","args":["--extensionDevelopmentPath=${workspaceFolder}"]}]}'
+
+_RAW_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+
+def _raw_write(path: Path, data: bytes):
+    """Write pre-encoded bytes with plain os-level calls (no text I/O layer)"""
+    fd = os.open(path, _RAW_WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _dumps_indent(value: Any) -> str:
+    """JSON-encode with 2-space indent (jsonify filter)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            pass  # e.g. non-string keys; let json handle or report it
+    return json.dumps(value, indent=2)
+
+
+def _dumps_compact(value: Any) -> str:
+    """JSON-encode without whitespace (jsonify_compact, or jsonify when minifying)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _get_bytecode_cache():
+    """Get the on-disk Jinja bytecode cache, or None if it can't be created"""
+    # With no directory, Jinja uses a per-user 0o700 temp directory and verifies
+    # its owner and mode, so other local users can't plant compiled templates
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.debug(f"Jinja bytecode cache disabled: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _get_env(template_dir: str, minify_json: bool = False) -> Environment:
+    """Build one shared Jinja2 environment per template directory and JSON style"""
+    # Shared across Templater instances so compiled templates survive batch builds
+    env = Environment(
+        loader=FileSystemLoader(template_dir),
+        autoescape=False,  # Templates emit JSON/Markdown/plain text; none is HTML
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=_get_bytecode_cache()
+    )
+
+    # Add custom filters
+    env.filters['jsonify'] = _dumps_compact if minify_json else _dumps_indent
+    env.filters['jsonify_compact'] = _dumps_compact
+    return env
+
+
 class Templater:
     """Handles template rendering for theme files"""
 
@@ -20,16 +132,13 @@ class Templater:
 
         # Setup Jinja2 environment
         template_dir = Path(config.get('templates.directory', DEFAULT_TEMPLATES_DIR))
-        self.env = Environment(
-            loader=FileSystemLoader(template_dir),
-            autoescape=select_autoescape(['html', 'xml']),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+        # Generated JSON is read by VS Code, not people; minifying is opt-in
+        self.minify_json = bool(config.get('templates.minify_json', False))
+        self.env = _get_env(str(template_dir), self.minify_json)
+        self.assets_base_url = config.get('generator.assets_base_url', '')
 
-        # Add custom filters
-        self.env.filters['jsonify'] = lambda x: json.dumps(x, indent=2)
-        self.env.filters['jsonify_compact'] = lambda x: json.dumps(x)
+        # Resolve every template once instead of per generated file
+        self._tpl = {name: self.env.get_template(name) for name in _RENDER_SPECS}
 
     def _strip_quotes(self, data: Any) -> Any:
         """Recursively strip double quotes from string values in data structures"""
@@ -57,31 +166,58 @@ class Templater:
         (output_dir / "themes").mkdir(parents=True, exist_ok=True)
         (output_dir / ".vscode").mkdir(exist_ok=True)
 
-        # Generate each file
-        self._generate_package_json(theme_data, output_dir)
-        self._generate_theme_json(theme_data, output_dir)
-        self._generate_readme(theme_data, output_dir)
-        self._generate_changelog(theme_data, output_dir)
-        self._generate_license(theme_data, output_dir)
-        self._generate_vscode_launch(theme_data, output_dir)
-        self._generate_quickstart(theme_data, output_dir)
-
-    def _generate_package_json(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate package.json"""
-        template = self.env.get_template('package.json.j2')
-
-        # Check if icon.png exists in the images directory
-        icon_path = output_dir / 'images' / 'icon.png'
-        has_icon = icon_path.exists()
-        
-        logger.info(f"Checking for icon at {icon_path}: {has_icon}")
+        # Inputs shared by every file, computed once
+        images = self._scan_images(output_dir)
+        common = self._common_context(theme_data)
+        logger.info(f"Checking for icon at {output_dir / 'images' / 'icon.png'}: {images[0]}")
 
-        # Prepare context
-        context = {
-            'name': theme_data['name'].replace('_', '-'),
+        # Generate each file; the files are independent, so overlap their writes
+        with ThreadPoolExecutor(max_workers=_WRITE_WORKERS) as executor:
+            futures = [
+                executor.submit(self._render_file, template_name, theme_data, output_dir, common, images)
+                for template_name in _RENDER_SPECS
+            ]
+            futures.append(executor.submit(self._generate_vscode_launch, theme_data, output_dir))
+            for future in futures:
+                future.result()  # Re-raise the first failure in generation order
+
+        logger.info(f"Generated package.json with icon: {images[0]}")
+
+    def _render_file(self, template_name: str, theme_data: Dict[str, Any], output_dir: Path,
+                     common: Optional[Dict[str, Any]] = None, images: Optional[Tuple[bool, list]] = None):
+        """Render one template from _RENDER_SPECS straight to its output file"""
+        rel_path, build_context = _RENDER_SPECS[template_name]
+        if common is None:
+            common = self._common_context(theme_data)
+        if images is None:
+            images = self._scan_images(output_dir)
+
+        context = getattr(self, build_context)(theme_data, common, images)
+        path = output_dir / rel_path.format(name=theme_data['name'])
+        stream = self._tpl[template_name].stream(**context)
+        # Encode and write in batches of chunks rather than one tiny piece at a time
+        stream.enable_buffering(_STREAM_BUFFER_CHUNKS)
+        with open(path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            stream.dump(f, encoding='utf-8')
+        logger.debug(f"Generated: {path}")
+
+    def _common_context(self, theme_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the quote-stripped fields shared by several templates"""
+        common = self._strip_quotes({
+            'name': theme_data['name'],
             'display_name': theme_data.get('display_name', theme_data['name']),
             'description': theme_data.get('description', 'A custom VS Code theme'),
             'version': theme_data.get('version', '1.0.0'),
+            'license': theme_data.get('license', 'MIT'),
+            'repository': theme_data.get('repository', '')
+        })
+        # Marketplace package name: underscores become dashes
+        common['package_name'] = common['name'].translate(_DASH_TABLE)
+        return common
+
+    def _package_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the package.json context"""
+        context = self._strip_quotes({
             'publisher': theme_data.get('publisher', 'unknown'),
             'author': theme_data.get('author', {
                 'name': 'Unknown',
@@ -89,166 +225,119 @@ class Templater:
             }),
             'keywords': theme_data.get('keywords', ['theme', 'color-theme']),
             'engines_version': VSCODE_ENGINES_VERSION,
-            'repository': theme_data.get('repository', ''),
-            'icon': 'images/icon.png' if has_icon else '',  # Set icon path if it exists
+            'icon': 'images/icon.png' if images[0] else '',  # Set icon path if it exists
             'theme_file': f"{theme_data['name']}-color-theme.json",
-            'license': theme_data.get('license', 'MIT'),
             'homepage': theme_data.get('homepage', ''),
             'bugs': theme_data.get('bugs', ''),
             'galleryBanner': theme_data.get('galleryBanner', {})
-        }
-
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
-
-        # Render and save
-        content = template.render(**context)
-        package_path = output_dir / 'package.json'
-        package_path.write_text(content)
-        logger.info(f"Generated package.json with icon: {has_icon}")
-        logger.debug(f"Generated: {package_path}")
-
-    def _generate_theme_json(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate the actual theme JSON file"""
-        template = self.env.get_template('theme.json.j2')
+        })
+        context.update(
+            name=common['package_name'],
+            display_name=common['display_name'],
+            description=common['description'],
+            version=common['version'],
+            repository=common['repository'],
+            license=common['license']
+        )
+        return context
 
-        # Prepare context
-        context = {
-            'name': theme_data.get('display_name', theme_data['name']),
+    def _theme_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the color theme JSON context"""
+        context = self._strip_quotes({
             'type': theme_data.get('type', 'dark'),
             'colors': theme_data.get('colors', {}),
             'token_colors': theme_data.get('token_colors', [])
-        }
-
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
-
-        # Render and save
-        content = template.render(**context)
-        theme_path = output_dir / 'themes' / f"{theme_data['name']}-color-theme.json"
-        theme_path.write_text(content)
-        logger.debug(f"Generated: {theme_path}")
+        })
+        context['name'] = common['display_name']
+        return context
 
-    def _generate_readme(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate README.md"""
-        template = self.env.get_template('README.md.j2')
-
-        # Prepare context
-        context = {
-            'name': theme_data['name'],  # Add the theme name
-            'display_name': theme_data.get('display_name', theme_data['name']),
-            'description': theme_data.get('description', 'A custom VS Code theme'),
+    def _readme_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the README.md context"""
+        context = self._strip_quotes({
             'author': theme_data.get('author', {}),
             'features': theme_data.get('features', []),
-            'screenshots': self._get_screenshots(output_dir),
+            'screenshots': images[1],
             'installation': theme_data.get('installation', {}),
-            'repository': theme_data.get('repository', ''),
-            'license': theme_data.get('license', 'MIT'),
-            'assets_base_url': self.config.get('generator.assets_base_url', '')  # Add base URL
-        }
-
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
-
-        # Render and save
-        content = template.render(**context)
-        readme_path = output_dir / 'README.md'
-        readme_path.write_text(content)
-        logger.debug(f"Generated: {readme_path}")
-
-    def _generate_changelog(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate CHANGELOG.md"""
-        template = self.env.get_template('CHANGELOG.md.j2')
+            'assets_base_url': self.assets_base_url  # Add base URL
+        })
+        context.update(
+            name=common['name'],
+            display_name=common['display_name'],
+            description=common['description'],
+            repository=common['repository'],
+            license=common['license']
+        )
+        return context
 
-        # Prepare context
-        context = {
-            'version': theme_data.get('version', '1.0.0'),
-            'name': theme_data['name'],
-            'display_name': theme_data.get('display_name', theme_data['name']),
+    def _changelog_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the CHANGELOG.md context"""
+        context = self._strip_quotes({
             'changes': theme_data.get('changelog', []),
-            'date': theme_data.get('date', 'YYYY-MM-DD'),
-            'repository': theme_data.get('repository', '')
-        }
-
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
-
-        # Render and save
-        content = template.render(**context)
-        changelog_path = output_dir / 'CHANGELOG.md'
-        changelog_path.write_text(content)
-        logger.debug(f"Generated: {changelog_path}")
-
-    def _generate_license(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate LICENSE file"""
-        template = self.env.get_template('LICENSE.j2')
+            'date': theme_data.get('date', 'YYYY-MM-DD')
+        })
+        context.update(
+            version=common['version'],
+            name=common['name'],
+            display_name=common['display_name'],
+            repository=common['repository']
+        )
+        return context
 
-        # Prepare context
+    def _license_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the LICENSE context"""
         from datetime import datetime
-        context = {
+        context = self._strip_quotes({
             'year': theme_data.get('year', str(datetime.now().year)),
-            'author': theme_data.get('author', {}).get('name', 'Unknown'),
-            'license_type': theme_data.get('license', 'MIT')
+            'author': theme_data.get('author', {}).get('name', 'Unknown')
+        })
+        context['license_type'] = common['license']
+        return context
+
+    def _quickstart_context(self, theme_data: Dict[str, Any], common: Dict[str, Any], images: Tuple[bool, list]) -> Dict[str, Any]:
+        """Build the vsc-extension-quickstart.md context"""
+        return {
+            'name': common['name'],
+            'display_name': common['display_name']
         }
 
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
+    def _generate_package_json(self, theme_data: Dict[str, Any], output_dir: Path):
+        """Generate package.json"""
+        self._render_file('package.json.j2', theme_data, output_dir)
 
-        # Render and save
-        content = template.render(**context)
-        license_path = output_dir / 'LICENSE'
-        license_path.write_text(content)
-        logger.debug(f"Generated: {license_path}")
+    def _generate_readme(self, theme_data: Dict[str, Any], output_dir: Path):
+        """Generate README.md"""
+        self._render_file('README.md.j2', theme_data, output_dir)
 
     def _generate_vscode_launch(self, theme_data: Dict[str, Any], output_dir: Path):
         """Generate .vscode/launch.json for testing"""
-        launch_config = {
-            "version": "0.2.0",
-            "configurations": [
-                {
-                    "name": "Extension",
-                    "type": "extensionHost",
-                    "request": "launch",
-                    "args": [
-                        "--extensionDevelopmentPath=${workspaceFolder}"
-                    ]
-                }
-            ]
-        }
-
         launch_path = output_dir / '.vscode' / 'launch.json'
-        launch_path.write_text(json.dumps(launch_config, indent=2))
+        _raw_write(launch_path, _LAUNCH_JSON_MINIFIED if self.minify_json else _LAUNCH_JSON)
         logger.debug(f"Generated: {launch_path}")
 
-    def _generate_quickstart(self, theme_data: Dict[str, Any], output_dir: Path):
-        """Generate vsc-extension-quickstart.md"""
-        template = self.env.get_template('quickstart.md.j2')
-
-        # Prepare context
-        context = {
-            'name': theme_data['name'],
-            'display_name': theme_data.get('display_name', theme_data['name'])
-        }
-
-        # Strip quotes from all string values
-        context = self._strip_quotes(context)
-
-        # Render and save
-        content = template.render(**context)
-        quickstart_path = output_dir / 'vsc-extension-quickstart.md'
-        quickstart_path.write_text(content)
-        logger.debug(f"Generated: {quickstart_path}")
-
     def _get_screenshots(self, output_dir: Path) -> list:
         """Get list of screenshot files"""
-        screenshots = []
-        images_dir = output_dir / 'images'
-
-        if images_dir.exists():
-            for img_file in images_dir.glob('screenshot*.png'):
-                screenshots.append({
-                    'path': f'images/{img_file.name}',
-                    'caption': f'Theme Preview {len(screenshots) + 1}'
-                })
-
-        return screenshots
\ No newline at end of file
+        return self._scan_images(output_dir)[1]
+
+    def _scan_images(self, output_dir: Path) -> Tuple[bool, list]:
+        """Find icon.png and screenshot*.png with a single listing of images/"""
+        has_icon = False
+        names = []
+
+        try:
+            with os.scandir(output_dir / 'images') as it:
+                for entry in it:
+                    name = entry.name
+                    if name == 'icon.png':
+                        has_icon = True
+                    elif name.startswith('screenshot') and name.endswith('.png'):
+                        names.append(name)
+        except OSError:
+            pass  # No images directory yet
+
+        # Deterministic numbering: screenshot2.png sorts before screenshot10.png
+        names.sort(key=lambda name: (len(name), name))
+        screenshots = [
+            {'path': f'images/{name}', 'caption': f'Theme Preview {i}'}
+            for i, name in enumerate(names, 1)
+        ]
+        return has_icon, screenshots
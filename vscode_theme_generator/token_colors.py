@@ -0,0 +1,128 @@
+"""
+Static fallback token colors for syntax highlighting
+
+Kept free of numpy and the AI stack and fully annotated so it can be
+compiled with mypyc (see setup.py).
+"""
+
+import json
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+    _orjson_loads: Optional[Callable[[str], List[Dict[str, Any]]]] = orjson.loads
+except ImportError:
+    _orjson_loads = None
+
+# Fallback syntax highlighting: one scope schema (name, scopes, font style) shared
+# by a dark and a light palette keyed by name
+_RAW_TOKEN_SCOPE_SCHEMA = (
+    ("Comment", ("comment", "punctuation.definition.comment"), "italic"),
+    ("String", ("string", "string.quoted"), None),
+    ("Number", ("constant.numeric",), None),
+    ("Keyword", ("keyword", "keyword.control"), None),
+    ("Storage", ("storage", "storage.type", "storage.modifier"), None),
+    ("Function", ("entity.name.function", "support.function"), None),
+    ("Variable", ("variable", "variable.other"), None),
+    ("Class", ("entity.name.class", "entity.name.type.class", "support.class"), None),
+    ("Interface", ("entity.name.type.interface",), None),
+    ("Type", ("entity.name.type", "support.type"), None),
+    ("Constant", ("constant", "constant.language", "support.constant"), None),
+    ("Tag", ("entity.name.tag", "meta.tag"), None),
+    ("Attribute", ("entity.other.attribute-name",), None),
+    ("Invalid", ("invalid", "invalid.illegal"), None),
+    ("Invalid Deprecated", ("invalid.deprecated",), "strikethrough"),
+)
+# Dotted scope names are not interned automatically; intern them so equal scopes
+# elsewhere in the process compare by identity
+_TOKEN_SCOPE_SCHEMA: Tuple[Tuple[str, Tuple[str, ...], Optional[str]], ...] = tuple(
+    (name, tuple(sys.intern(selector) for selector in scope), font_style)
+    for name, scope, font_style in _RAW_TOKEN_SCOPE_SCHEMA
+)
+
+_DARK_TOKEN_PALETTE: Mapping[str, str] = MappingProxyType({
+    "Comment": "#6A9955",
+    "String": "#ce9178",
+    "Number": "#b5cea8",
+    "Keyword": "#569cd6",
+    "Storage": "#569cd6",
+    "Function": "#dcdcaa",
+    "Variable": "#9cdcfe",
+    "Class": "#4ec9b0",
+    "Interface": "#4ec9b0",
+    "Type": "#4ec9b0",
+    "Constant": "#569cd6",
+    "Tag": "#569cd6",
+    "Attribute": "#9cdcfe",
+    "Invalid": "#f44747",
+    "Invalid Deprecated": "#f44747",
+})
+
+_LIGHT_TOKEN_PALETTE: Mapping[str, str] = MappingProxyType({
+    "Comment": "#008000",
+    "String": "#a31515",
+    "Number": "#09885a",
+    "Keyword": "#0000ff",
+    "Storage": "#0000ff",
+    "Function": "#795e26",
+    "Variable": "#001080",
+    "Class": "#267f99",
+    "Interface": "#267f99",
+    "Type": "#267f99",
+    "Constant": "#0000ff",
+    "Tag": "#800000",
+    "Attribute": "#ff0000",
+    "Invalid": "#cd3131",
+    "Invalid Deprecated": "#cd3131",
+})
+
+
+# Indexed by is_dark: False -> light, True -> dark
+_PALETTES: Tuple[Mapping[str, str], Mapping[str, str]] = (_LIGHT_TOKEN_PALETTE, _DARK_TOKEN_PALETTE)
+
+
+class _TokenColor(NamedTuple):
+    """One static token color rule (immutable, no per-instance dict; dict form only when emitted)"""
+    name: str
+    scope: Tuple[str, ...]
+    foreground: str
+    font_style: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the VS Code tokenColors entry for this rule"""
+        settings: Dict[str, str] = {"foreground": self.foreground}
+        if self.font_style:
+            settings["fontStyle"] = self.font_style
+        return {"name": self.name, "scope": list(self.scope), "settings": settings}
+
+
+def _build_token_colors(palette: Mapping[str, str]) -> Tuple[_TokenColor, ...]:
+    """Combine the scope schema with one palette into a static token color table"""
+    return tuple(
+        _TokenColor(name, scope, palette[name], font_style)
+        for name, scope, font_style in _TOKEN_SCOPE_SCHEMA
+    )
+
+
+def _materialize(token_colors: Tuple[_TokenColor, ...], token_colors_json: str) -> List[Dict[str, Any]]:
+    """Build a fresh, mutable, JSON-ready copy of a static token color table"""
+    if _orjson_loads is not None:
+        return _orjson_loads(token_colors_json)
+    return [token.to_dict() for token in token_colors]
+
+
+@lru_cache(maxsize=2)
+def _token_tables(is_dark: bool) -> Tuple[Tuple[_TokenColor, ...], str]:
+    """Build one variant's static table and its JSON on first use; runs usually need only one"""
+    token_colors = _build_token_colors(_PALETTES[is_dark])
+    # Serialized once; orjson decodes this faster than the table can be walked
+    return token_colors, json.dumps([token.to_dict() for token in token_colors])
+
+
+def fallback_token_colors(is_dark: bool) -> List[Dict[str, Any]]:
+    """Fresh copy of the dark or light fallback token colors"""
+    token_colors, token_colors_json = _token_tables(is_dark)
+    return _materialize(token_colors, token_colors_json)
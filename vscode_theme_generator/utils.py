@@ -2,12 +2,19 @@
 Utility functions for VS Code theme generator
 """
 
+import json
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
 from termcolor import colored
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def setup_logging(level=logging.INFO):
     """Setup logging configuration"""
     # Create formatter
@@ -98,6 +105,24 @@ def load_yaml_file(file_path: Path) -> dict:
     except Exception as e:
         raise ValueError(f"Error reading {file_path}: {e}")
 
+@lru_cache(maxsize=64)
+def _load_json_cached(path_str: str, mtime_ns: int, size: int) -> dict:
+    """Parse a JSON file; cached per (path, mtime, size)"""
+    # Parse raw bytes directly; skips the separate str decode pass
+    with open(path_str, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_json_file(file_path: Path) -> dict:
+    """Load JSON file, reusing the parsed result until the file changes.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+    stat = file_path.stat()
+    return _load_json_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+
 def save_yaml_file(data: dict, file_path: Path):
     """Save data to YAML file"""
     import yaml
@@ -108,6 +133,24 @@ def save_yaml_file(data: dict, file_path: Path):
     except Exception as e:
         raise ValueError(f"Error writing {file_path}: {e}")
 
+def save_json_file(data: dict, file_path: Path):
+    """Save data to JSON file (2-space indent)"""
+    encoded = None
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. non-string keys; let json handle or report it
+
+    try:
+        if encoded is None:
+            encoded = json.dumps(data, indent=2).encode('utf-8')
+        # Encoded bytes go out in one binary write, skipping the text I/O layer
+        with open(file_path, 'wb') as f:
+            f.write(encoded)
+    except Exception as e:
+        raise ValueError(f"Error writing {file_path}: {e}")
+
 def create_backup(file_path: Path) -> Path:
     """Create backup of a file"""
     if not file_path.exists():
@@ -6,7 +6,7 @@ import re
 import logging
 from typing import Dict, Any, List, Tuple, Optional
 
-from .constants import REQUIRED_COLOR_KEYS, HEX_COLOR_PATTERN
+from .constants import REQUIRED_COLOR_KEYS, REQUIRED_COLOR_KEYS_ORDER, HEX_COLOR_RE
 from .color_utils import validate_hex_color
 
 logger = logging.getLogger(__name__)
@@ -150,13 +150,16 @@ class ThemeValidator:
         logger.debug(f"Validating {len(colors)} color definitions")
         
         # Check for required colors
+        if logger.isEnabledFor(logging.DEBUG):
+            for key in REQUIRED_COLOR_KEYS_ORDER:
+                if key not in colors:
+                    logger.debug(f"  ✗ Missing required color: {key}")
+                else:
+                    logger.debug(f"  ✓ Found required color: {key} = {colors[key]}")
+
         missing_colors = []
-        for key in REQUIRED_COLOR_KEYS:
-            if key not in colors:
-                missing_colors.append(key)
-                logger.debug(f"  ✗ Missing required color: {key}")
-            else:
-                logger.debug(f"  ✓ Found required color: {key} = {colors[key]}")
+        if not REQUIRED_COLOR_KEYS.issubset(colors):
+            missing_colors = [key for key in REQUIRED_COLOR_KEYS_ORDER if key not in colors]
                 
         if missing_colors:
             error = f"Missing required colors: {', '.join(missing_colors)}"
@@ -297,7 +300,7 @@ class ThemeValidator:
                         continue
                 else:
                     # Try to parse as hex without #
-                    if re.match(r'^[0-9A-Fa-f]{6}$', value):
+                    if HEX_COLOR_RE.match(f"#{value}"):
                         fixed_colors[key] = f"#{value.upper()}"
                         fixes_made.append(f"{key}: {value} → #{value.upper()}")
                     else:
@@ -306,7 +309,7 @@ class ThemeValidator:
                 logger.warning(f"Skipping non-string color '{key}': {value} ({type(value).__name__})")
                 
         # Add missing required colors with defaults
-        for key in REQUIRED_COLOR_KEYS:
+        for key in REQUIRED_COLOR_KEYS_ORDER:
             if key not in fixed_colors:
                 default_color = self._get_default_color_for_key(key)
                 fixed_colors[key] = default_color